@@ -1,13 +1,19 @@
-from typing import Dict, List, Tuple
-from heapq import heappop, heappush
+from typing import Dict, Iterator, List, Tuple
 from enum import Enum
- 
-DIRECTIONS = [
-    (-1, 0), # UP
-    (1, 0),  # DOWN
-    (0, -1), # LEFT
-    (0, 1)  # RIGHT
-]
+from array import array
+from itertools import compress, repeat
+from operator import sub
+from time import perf_counter
+from cache import TranspositionTable
+from grid import Grid, reaches_goal
+from pqueue import new_queue
+from stats import SearchStats
+from distances import bfs_field, manhattan_field, unreachable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python tables hold the same bounds.
+    np = None
  
 class Action(Enum):
     UP = 0
@@ -17,190 +23,597 @@ class Action(Enum):
     FLASH = 4
     INVERSION = 5
 
-# Invert the maze and return a list of positions with inverted creep dmg. 
-def inversion(creeps_list: List[Tuple[int, int, int]], obstacles_set: set, rows: int, columns: int) -> List[Tuple[int, int, int]]:
-    creeps_set = set(creeps_list)
-    max_creeps = max(num for x, y, num in creeps_set if (x, y) not in obstacles_set)
-    
-    # Generate a set of all cells in the maze.
-    all_cells = {(x, y) for x in range(rows) for y in range(columns)}
-    
-    # Cells with no creeps.
-    no_creeps_cells = all_cells - {(x, y) for x, y, _ in creeps_set} - obstacles_set
-    
-    # Create the inverted set for cells with no creeps.
-    no_creeps_inverted = {(x, y, max_creeps) for x, y in no_creeps_cells}
-    
-    # Invert the creeps based on their original order.
-    inverted_creeps_list = [(x, y, max_creeps - num) if (x, y, num) in creeps_set else (x, y, num) for x, y, num in creeps_list]
-    
-    # Add creeps from no_creeps_inverted.
-    inverted_creeps_list += list(no_creeps_inverted)
-
-    return inverted_creeps_list
- 
-# Precompute Manhattan distances into a dictionary.
-def manhattan_distances(rows: int, columns: int, goals_set: set) -> Dict[Tuple[int, int], int]:
-    distances = {}
-    for x in range(rows):
-        for y in range(columns):
-            pos = (x, y)
-            distances[pos] = min([abs(pos[0] - goal[0]) + abs(pos[1] - goal[1]) for goal in goals_set])
-    return distances
- 
-# Manhattan Distance adjusted for creep damage.
-def heuristic(pos: Tuple[int, int], min_creep_dmg: int, precomputed_distances: Dict[Tuple[int, int], int]) -> int:
-    manhattan_dist =  precomputed_distances[pos] 
-    heuristic_cost = manhattan_dist * (1 + min_creep_dmg)
-    return heuristic_cost
- 
-# Calculate move cost for normal or flash moves.
-def get_move_cost(curr_pos: Tuple[int, int], direction: Tuple[int, int], obstacles_set: List[Tuple[int, int]], creep_damage_map: Dict[Tuple[int, int], int], rows: int, columns: int, flash = False) -> Tuple[Tuple[int, int], int]:
-    x, y = curr_pos
-    dx, dy = direction
+# Path cost of states not reached yet, above any real path cost.
+UNSEEN = 2 ** 62
+
+# Flip table turning the occupancy map into a free cell mask.
+FREE = bytes([1, 0]) + bytes(254)
+
+# Creep damage of every free cell, scanned at C speed.
+def free_damages(grid: Grid) -> Iterator[int]:
+    return compress(grid.damage, bytes(grid.blocked).translate(FREE))
+
+# Invert the maze and return the inverted creep dmg of every cell.
+# Only free cells are ever entered, so the border and obstacles are inverted too
+# rather than skipped.
+def inversion(grid: Grid) -> array:
+    max_creeps = max(free_damages(grid), default=0)
+
+    # Cells with no creeps get the max creeps, others are inverted.
+    return array("i", map(sub, repeat(max_creeps), grid.damage))
+
+class InvertedDamage:
+    # Inverted creep damage looked up cell by cell, as max_creeps - damage, so a search
+    # only scans for the max creeps instead of building the whole inverted map.
+    def __init__(self, grid: Grid):
+        self.damage = grid.damage
+        self.max_creeps = max(free_damages(grid), default=0)
+
+    def __getitem__(self, cell: int) -> int:
+        return self.max_creeps - self.damage[cell]
+ 
+# Precompute Manhattan distances into a flat array indexed by cell.
+def manhattan_distances(grid: Grid, goals: List[Tuple[int, int]]) -> array:
+    return manhattan_field(grid, goals)
+
+# Distance fields selectable for the heuristic, obstacle-aware "bfs" is never weaker.
+DISTANCE_FIELDS = {
+    "manhattan": manhattan_distances,
+    "bfs": bfs_field,
+}
+ 
+# Lower bounds on the cost to the nearest goal from every cell, as flat arrays indexed
+# by cell, for one layer of states: those with or without flashes left, inverted or not.
+# min_dmg is the least creep damage taken landing on a free cell before inverting.
+# Once inverted, the free cell with the max creeps takes no damage. The tables are
+# built with whole-array arithmetic when NumPy is available.
+
+# Distances times a factor, rounded down.
+def scaled(distances: array, factor: float) -> array:
+    if np is not None:
+        return _numpy_table(np.frombuffer(distances, dtype=distances.typecode) * factor)
+    return array("l", [int(distance * factor) for distance in distances])
+
+def _numpy_table(values) -> array:
+    table = array("l")
+    table.frombytes(values.astype(table.typecode).tobytes())
+    return table
+
+# Original heuristic, the distance scaled by the layer's damage floor.
+def creep_bounds(distances: array, has_flash: bool, is_inverted: bool, min_dmg: int) -> array:
+    return scaled(distances, 1 + (0 if is_inverted else min_dmg))
+
+# Each cell moved costs at least 4, and a flash covering any number of cells costs
+# 2 per cell plus 10, more flashes only adding to that. States not yet inverted can
+# still invert for free, so no layer has a damage floor above 0. Admissible and
+# consistent for both distance fields.
+def flash_bounds(distances: array, has_flash: bool, is_inverted: bool, min_dmg: int) -> array:
+    if not has_flash:
+        return scaled(distances, 4)
+    if np is not None:
+        values = np.frombuffer(distances, dtype=distances.typecode)
+        return _numpy_table(np.minimum(4 * values, 2 * values + 10))
+    return array("l", [min(4 * distance, 2 * distance + 10) for distance in distances])
+
+# Heuristics selectable per search, "flash" is never weaker than "creep", each with
+# the (has_flash, is_inverted) its bounds depend on for a layer.
+HEURISTICS = {
+    "creep": (creep_bounds, lambda has_flash, is_inverted: (False, is_inverted)),
+    "flash": (flash_bounds, lambda has_flash, is_inverted: (has_flash, False)),
+}
+
+class Bounds:
+    # Heuristic tables for one search, one per layer of states, built the first time
+    # the layer is reached and shared by layers with the same bounds. A weight above 1
+    # inflates them for weighted A*, trading optimality for speed: paths cost at most
+    # weight times the optimal cost.
+    # Building a table mid-search counts as precomputation in stats, if given.
+    def __init__(self, kind: str, distances: array, min_dmg: int, weight: float = 1.0, stats: SearchStats = None):
+        self.make_bounds, self.layer = HEURISTICS[kind]
+        self.distances = distances
+        self.min_dmg = min_dmg
+        self.weight = weight
+        self.stats = stats
+        self._tables = {}
+
+    def table(self, has_flash: bool, is_inverted: bool) -> array:
+        key = self.layer(has_flash, is_inverted)
+        if key not in self._tables:
+            if self.stats is not None:
+                self.stats.mark("search")
+            table = self.make_bounds(self.distances, *key, self.min_dmg)
+            if self.weight != 1:
+                table = scaled(table, self.weight)
+            self._tables[key] = table
+            if self.stats is not None:
+                self.stats.mark("precompute")
+        return self._tables[key]
+ 
+# Calculate move cost for normal moves.
+def get_move_cost(cur_cell: int, offset: int, grid: Grid, creep_damage: array) -> Tuple[int, int]:
     hp_lost = 0
-    flash_steps_moved = 0
- 
-    if flash:
-        while 0 <= x + dx < rows and 0 <= y + dy < columns and (x + dx, y + dy) not in obstacles_set:
-            x += dx
-            y += dy
-            flash_steps_moved += 1
-        hp_lost = (2 * flash_steps_moved) + creep_damage_map.get((x, y), 0)  + 10
-    else:
-        if 0 <= x + dx < rows and 0 <= y + dy < columns and (x + dx, y + dy) not in obstacles_set:
-            x += dx
-            y += dy
-            hp_lost = 4 + creep_damage_map.get((x, y), 0)
- 
-    return (x, y), hp_lost
+    if not grid.blocked[cur_cell + offset]:
+        cur_cell += offset
+        hp_lost = 4 + creep_damage[cur_cell]
+    return cur_cell, hp_lost
+
+# Calculate move cost for flash moves from the precomputed landing cells.
+def get_flash_cost(cur_cell: int, offset: int, landings: array, creep_damage: array) -> Tuple[int, int]:
+    flash_cell = landings[cur_cell]
+    flash_steps_moved = (flash_cell - cur_cell) // offset
+    hp_lost = (2 * flash_steps_moved) + creep_damage[flash_cell] + 10
+    return flash_cell, hp_lost
+
+# Pack a search state into a single int, ordered like a (cell, flashes, is_inverted) tuple.
+def pack_state(cell: int, flashes: int, is_inverted: bool, max_flash: int) -> int:
+    return (cell * (max_flash + 1) + flashes) * 2 + is_inverted
+
+# Unpack a search state back into its cell, number of flashes left and is_inverted.
+def unpack_state(state: int, max_flash: int) -> Tuple[int, int, bool]:
+    cell, flashes = divmod(state >> 1, max_flash + 1)
+    return cell, flashes, bool(state & 1)
+
+# Helper function to build the list of actions taken from the start state to a state.
+# came_from maps each state reached to its parent state shifted left by 2, plus the
+# direction moved (or flashed) into it. Whether each step was a move, flash or
+# inversion follows from the two states.
+def build_state_actions(state: int, start_state: int, came_from: Dict[int, int], max_flash: int) -> List[int]:
+    path = []
+    while state != start_state:
+        parent, direction = divmod(came_from[state], 4)
+        if state - parent == 1:
+            path.append(Action.INVERSION.value)
+        else:
+            path.append(direction)
+            if (state >> 1) % (max_flash + 1) != (parent >> 1) % (max_flash + 1):
+                path.append(Action.FLASH.value)
+        state = parent
+    return path[::-1]
+
+# Cost of the path build_state_actions gives for a state, stepping back through
+# came_from. ARA* needs it as a state's cost is not lowered when a cheaper path to
+# one of its ancestors is found, so its own path can cost less than its g.
+# damages holds the creep damage before and after inversion.
+def state_path_cost(state: int, start_state: int, came_from: Dict[int, int], max_flash: int, grid: Grid,
+                    damages: Tuple) -> int:
+    cost = 0
+    while state != start_state:
+        parent, direction = divmod(came_from[state], 4)
+        if state - parent != 1:
+            cell, flashes, _ = unpack_state(state, max_flash)
+            parent_cell, parent_flashes, is_inverted = unpack_state(parent, max_flash)
+            damage = damages[is_inverted][cell]
+            if flashes != parent_flashes:
+                cost += 2 * ((cell - parent_cell) // grid.offsets[direction]) + 10 + damage
+            else:
+                cost += 4 + damage
+        state = parent
+    return cost
 
 # Run A* Search algorithm.
-def run_a_star(columns: int, rows: int, obstacles_set: set, creeps_list: List[Tuple[int, int, int]], start_pos: Tuple[int, int], goals_set: set, max_flash: int) -> List[int]:
+# Fills stats, if given, with what the search did and the cost of the path found.
+def run_a_star(grid: Grid, start_cell: int, goals: List[Tuple[int, int]], max_flash: int, queue: str = "heap",
+               stats: SearchStats = None, distance: str = "manhattan", bound: str = "flash", weight: float = 1.0) -> List[int]:
+    if stats is None:
+        stats = SearchStats()
     
+    # States are packed ints (see pack_state), so the tables below are keyed by ints
+    # instead of tuples. They only hold states reached, as the number of possible
+    # states grows with the flashes and most are never reached.
+    cell_stride = (max_flash + 1) * 2  # State change for moving one cell id.
+    start_state = pack_state(start_cell, max_flash, False, max_flash)
+
     # Create a pq for A* Search.
-    pq = ([(0, start_pos, max_flash, False, 0)]) # cost, position, number of flashes left, is_inverted, total path cost.
-    start_state = (start_pos, max_flash, False)
+    pq = new_queue(queue)
+    pq.push((0, start_state)) # cost, state.
+    goals_flags = grid.flags(goals)
     
     # Check if start already is goal.
-    if start_pos in goals_set:
+    if goals_flags[start_cell]:
+        stats.cost = 0
+        stats.mark("search")
         return []
  
-    # Initialize visited_state set to track visited states.
+    # Closed set of explored states.
     visited_state = set()
     
-    # Pre-compute inversion set.
-    inverted_creeps_list = inversion(creeps_list, obstacles_set, rows, columns)
+    # Inverted creep damage is looked up per cell (see InvertedDamage), set up once
+    # an inverted state is expanded.
+    creep_damage = grid.damage
+    inverted_creep_damage = None
+
+    # Pre-compute heuristic components, the least damage taken entering any free cell.
+    min_creep_dmg = min(free_damages(grid), default=0)
 
-    # Pre-compute creep locations.
-    creep_damage_map = {(x, y): dmg for x, y, dmg in creeps_list}
-    inverted_creep_damage_map = {(x, y): dmg for x, y, dmg in inverted_creeps_list}
+    # Pre-compute where a flash in each direction lands from every cell.
+    flash_landings = grid.flash_landings() if max_flash > 0 else None
 
-    # Pre-compute heuristic components.
-    min_creep_dmg = min(num for (_, _, num) in creeps_list)
-    min_inverted_creep_dmg = min(num for (_, _, num) in inverted_creeps_list)
+    # Pre-compute distances to the nearest goal.
+    precomputed_distances = DISTANCE_FIELDS[distance](grid, goals)
 
-    # Pre-compute Manhattan distances.
-    precomputed_distances = manhattan_distances(rows, columns, goals_set)
+    # Heuristic tables, built the first time a layer is reached.
+    bounds = Bounds(bound, precomputed_distances, min_creep_dmg, weight, stats).table
  
-    # Dictionary to store parent nodes for backtracking.
-    came_from = {start_state: None}
+    # Parent state and the direction moved (or flashed) into each state, for
+    # backtracking, packed as in build_state_actions.
+    came_from = {}
+
+    # Cheapest known path cost to each state. Successors are only pushed when they
+    # improve on it, so the open list holds few duplicate entries.
+    g_score = {start_state: 0}
+    stats.mark("precompute")
+
+    expanded = pops = stale_pops = 0
+    pushes = peak_open = 1
+
+    def report(cost: int = None) -> None:
+        stats.expanded, stats.pushes, stats.pops, stats.stale_pops = expanded, pushes, pops, stale_pops
+        stats.peak_frontier, stats.cost = peak_open, cost
+        stats.mark("search")
  
     while pq: 
-        _, cur_pos, flashes, is_inverted, path_cost = heappop(pq) 
+        _, curr_state = pq.pop() 
+        pops += 1
+        path_cost = g_score[curr_state]
         
-        # If visited state has already been explored, skip it.
-        curr_state = (cur_pos, flashes, is_inverted)
+        # If visited state has already been explored, skip it. Stale entries for a
+        # state always come after its cheapest one, so they are skipped here too.
         if curr_state in visited_state:
+            stale_pops += 1
             continue
+        cur_cell, flashes, is_inverted = unpack_state(curr_state, max_flash)
         
         # Add to visited state.
         visited_state.add(curr_state)
+        expanded += 1
  
         # Goal test by back-forming path.
-        if cur_pos in goals_set:
-            path_new = []
-            current = curr_state
-            while current != start_state:
-                action = came_from[current][1]
-                if isinstance(action, tuple):
-                    path_new.append(action[1])
-                    path_new.append(action[0])
-                else:
-                    path_new.append(action)
-                current = came_from[current][0]
-            return path_new[::-1]  
+        if goals_flags[cur_cell]:
+            report(path_cost)
+            return build_state_actions(curr_state, start_state, came_from, max_flash)
+        
+        if is_inverted:
+            if inverted_creep_damage is None:
+                stats.mark("search")
+                inverted_creep_damage = InvertedDamage(grid)
+                stats.mark("precompute")
+            damage = inverted_creep_damage
+        else:
+            damage = creep_damage
+        move_bounds = bounds(flashes > 0, is_inverted)
          
         # Get pos and cost for normal moves + flash.
-        for action_val, direction in enumerate(DIRECTIONS):
+        for action_val, offset in enumerate(grid.offsets):
             
             #=== Normal moves: ===#
-            if is_inverted:
-                new_pos, move_cost = get_move_cost(cur_pos, direction, obstacles_set, inverted_creep_damage_map, rows, columns, flash = False)
-                move_heuristic_cost = heuristic(new_pos, min_inverted_creep_dmg, precomputed_distances)
-            else:
-                new_pos, move_cost = get_move_cost(cur_pos, direction, obstacles_set, creep_damage_map, rows, columns, flash = False)
-                move_heuristic_cost = heuristic(new_pos, min_creep_dmg, precomputed_distances)
+            new_cell, move_cost = get_move_cost(cur_cell, offset, grid, damage)
             new_path_cost = path_cost + move_cost
-            f = new_path_cost + move_heuristic_cost   
-            if (new_pos, flashes, is_inverted) not in visited_state:
-                new_state = (f, new_pos, flashes, is_inverted, new_path_cost)
-                heappush(pq, new_state)
-                if (new_pos, flashes, is_inverted) not in came_from or new_path_cost < came_from[(new_pos, flashes, is_inverted)][2]:
-                    # Only replace duplicates in parent directory if the cost is lower.
-                    came_from[(new_pos, flashes, is_inverted)] = (curr_state, (action_val), new_path_cost)
+            new_state = curr_state + (new_cell - cur_cell) * cell_stride
+            if new_path_cost < g_score.get(new_state, UNSEEN) and new_state not in visited_state:
+                # Only push and replace the parent if the cost is lower.
+                g_score[new_state] = new_path_cost
+                came_from[new_state] = curr_state << 2 | action_val
+                pq.push((new_path_cost + move_bounds[new_cell], new_state))
+                pushes += 1
  
             #=== Flash moves: ===#
             if flashes > 0:
-                if is_inverted:
-                    flash_pos, flash_cost = get_move_cost(cur_pos, direction, obstacles_set, inverted_creep_damage_map, rows, columns, flash = True)
-                    flash_heuristic_cost = heuristic(flash_pos, min_inverted_creep_dmg, precomputed_distances)
-                else:
-                    flash_pos, flash_cost = get_move_cost(cur_pos, direction, obstacles_set, creep_damage_map, rows, columns, flash = True)
-                    flash_heuristic_cost = heuristic(flash_pos, min_creep_dmg, precomputed_distances)
+                flash_bounds_after = bounds(flashes > 1, is_inverted)
+                flash_cell, flash_cost = get_flash_cost(cur_cell, offset, flash_landings[action_val], damage)
                 new_path_cost = path_cost + flash_cost
-                f = new_path_cost + flash_heuristic_cost
-                if (flash_pos, flashes - 1, is_inverted) not in visited_state:
-                    new_flash_state = (f, flash_pos, flashes - 1, is_inverted, new_path_cost)
-                    heappush(pq, new_flash_state)
-                    if (flash_pos, flashes - 1, is_inverted) not in came_from or new_path_cost < came_from[(flash_pos, flashes - 1, is_inverted)][2]:
-                        # Only replace duplicates in parent directory if the cost is lower.
-                        came_from[(flash_pos, flashes - 1, is_inverted)] = (curr_state, (Action.FLASH.value, action_val), new_path_cost)
+                new_state = curr_state + (flash_cell - cur_cell) * cell_stride - 2
+                if new_path_cost < g_score.get(new_state, UNSEEN) and new_state not in visited_state:
+                    # Only push and replace the parent if the cost is lower.
+                    g_score[new_state] = new_path_cost
+                    came_from[new_state] = curr_state << 2 | action_val
+                    pq.push((new_path_cost + flash_bounds_after[flash_cell], new_state))
+                    pushes += 1
         
         #=== Inversion: ===#
-        if not is_inverted and (cur_pos, flashes, True) not in visited_state:
-            f = path_cost + heuristic(cur_pos, min_inverted_creep_dmg, precomputed_distances)
-            heappush(pq, (f, cur_pos, flashes, True, path_cost))
-            if (cur_pos, flashes, True) not in came_from or path_cost < came_from[(cur_pos, flashes, True)][2]:
-                # Only replace duplicates in parent directory if the cost is lower.
-                came_from[(cur_pos, flashes, True)] = (curr_state, (Action.INVERSION.value), path_cost) 
+        new_state = curr_state + 1
+        if not is_inverted and path_cost < g_score.get(new_state, UNSEEN) and new_state not in visited_state:
+            # Only push and replace the parent if the cost is lower.
+            g_score[new_state] = path_cost
+            came_from[new_state] = curr_state << 2
+            pq.push((path_cost + bounds(flashes > 0, True)[cur_cell], new_state))
+            pushes += 1
+
+        peak_open = max(peak_open, len(pq))
+    report()
     return []
  
-def search(dct: Dict) -> List[int]:
+# Run Anytime Repairing A* (ARA*), yielding the actions of each cheaper path found.
+# Starts as weighted A* and lowers the weight by weight_step after every pass down
+# to 1, which gives an optimal path. Each pass reuses the previous one's costs: only
+# states whose cost dropped after they were expanded (the INCONS list) and those
+# still open are searched again, and the heuristic tables, built once, are weighted
+# as states are pushed. Stops once the path is optimal or time_limit seconds have
+# passed, so a caller gets the best path found in the time it has. The first pass
+# always runs to the end, so a path is yielded whenever a goal can be reached,
+# even if that takes longer than time_limit.
+# Fills stats, if given, with the weight and cost of the last path yielded and what
+# the passes so far did. Time spent by the caller between paths is not counted.
+def run_ara_star(grid: Grid, start_cell: int, goals: List[Tuple[int, int]], max_flash: int, time_limit: float,
+                 weight: float = 3.0, weight_step: float = 0.5, queue: str = "heap", stats: SearchStats = None,
+                 distance: str = "manhattan", bound: str = "flash") -> Iterator[List[int]]:
+    if stats is None:
+        stats = SearchStats()
+    deadline = perf_counter() + time_limit
+    cell_stride = (max_flash + 1) * 2
+    start_state = pack_state(start_cell, max_flash, False, max_flash)
+    goals_flags = grid.flags(goals)
+    if goals_flags[start_cell]:
+        stats.weight, stats.cost = weight, 0
+        stats.mark("search")
+        yield []
+        return
+
+    creep_damage = grid.damage
+    inverted_creep_damage = None
+    min_creep_dmg = min(free_damages(grid), default=0)
+    flash_landings = grid.flash_landings() if max_flash > 0 else None
+    precomputed_distances = DISTANCE_FIELDS[distance](grid, goals)
+    bounds = Bounds(bound, precomputed_distances, min_creep_dmg, stats=stats).table
+
+    # Tables keyed by packed state, holding only states reached, as in run_a_star.
+    came_from = {}
+    g_score = {start_state: 0}
+
+    # States to search in the next pass: open ones, and closed ones whose cost dropped.
+    pending = {start_state}
+
+    # Cheapest goal state reached so far. Goal states are never expanded, no path
+    # through one is cheaper than stopping there.
+    best_state, best_cost = -1, UNSEEN
+    yielded_cost = UNSEEN
+    expanded = pushes = pops = stale_pops = peak_open = passes = 0
+    stats.mark("precompute")
+
+    def report() -> None:
+        stats.expanded, stats.pushes, stats.pops, stats.stale_pops = expanded, pushes, pops, stale_pops
+        stats.peak_frontier, stats.passes = peak_open, passes
+        stats.mark("search")
+
+    while True:
+        passes += 1
+        visited_state = set()
+        pq = new_queue(queue)
+        for state in sorted(pending):
+            cell, flashes, is_inverted = unpack_state(state, max_flash)
+            pq.push((g_score[state] + int(weight * bounds(flashes > 0, is_inverted)[cell]), state))
+            pushes += 1
+
+        while pq:
+            peak_open = max(peak_open, len(pq))
+            f, curr_state = pq.pop()
+            pops += 1
+            if curr_state in visited_state:
+                stale_pops += 1
+                continue
+            if f >= best_cost:
+                break
+            expanded += 1
+            if passes > 1 and not expanded & 255 and perf_counter() > deadline:
+                report()
+                return
+            visited_state.add(curr_state)
+            pending.discard(curr_state)
+            path_cost = g_score[curr_state]
+            cur_cell, flashes, is_inverted = unpack_state(curr_state, max_flash)
+
+            if is_inverted:
+                if inverted_creep_damage is None:
+                    stats.mark("search")
+                    inverted_creep_damage = InvertedDamage(grid)
+                    stats.mark("precompute")
+                damage = inverted_creep_damage
+            else:
+                damage = creep_damage
+
+            # Successors as (state, cost, direction, heuristic table).
+            successors = []
+            for action_val, offset in enumerate(grid.offsets):
+                new_cell, move_cost = get_move_cost(cur_cell, offset, grid, damage)
+                successors.append((curr_state + (new_cell - cur_cell) * cell_stride, path_cost + move_cost, action_val,
+                                   bounds(flashes > 0, is_inverted)[new_cell]))
+                if flashes > 0:
+                    flash_cell, flash_cost = get_flash_cost(cur_cell, offset, flash_landings[action_val], damage)
+                    successors.append((curr_state + (flash_cell - cur_cell) * cell_stride - 2, path_cost + flash_cost, action_val,
+                                       bounds(flashes > 1, is_inverted)[flash_cell]))
+            if not is_inverted:
+                successors.append((curr_state + 1, path_cost, 0, bounds(flashes > 0, True)[cur_cell]))
+
+            for new_state, new_path_cost, action_val, new_bound in successors:
+                if new_path_cost >= g_score.get(new_state, UNSEEN):
+                    continue
+                g_score[new_state] = new_path_cost
+                came_from[new_state] = curr_state << 2 | action_val
+                if goals_flags[(new_state >> 1) // (max_flash + 1)]:
+                    if new_path_cost < best_cost:
+                        best_state, best_cost = new_state, new_path_cost
+                    continue
+                pending.add(new_state)
+                if new_state not in visited_state:
+                    pq.push((new_path_cost + int(weight * new_bound), new_state))
+                    pushes += 1
+
+        report()
+        if best_cost < yielded_cost:
+            best_cost = state_path_cost(best_state, start_state, came_from, max_flash, grid,
+                                        (creep_damage, inverted_creep_damage))
+            g_score[best_state] = yielded_cost = best_cost
+            stats.weight, stats.cost = weight, best_cost
+            yield build_state_actions(best_state, start_state, came_from, max_flash)
+            stats.start()
+        if weight <= 1 or perf_counter() > deadline:
+            return
+        weight = max(1.0, weight - weight_step)
+ 
+# Run IDA*, memory-bounded A*: depth-first passes expanding only states with
+# f = g + h up to a threshold, raised after each pass to the lowest f that went
+# over it. Only the current path is kept, plus a transposition table of cache_size
+# slots with the cheapest cost states were reached at in the pass, which prunes the
+# repeated paths through the same states a grid is full of.
+# Fills stats, if given, as run_a_star, with passes and the longest path as the peak frontier.
+def run_ida_star(grid: Grid, start_cell: int, goals: List[Tuple[int, int]], max_flash: int, cache_size: int = 1 << 12,
+                 stats: SearchStats = None, distance: str = "manhattan", bound: str = "flash") -> List[int]:
+    if stats is None:
+        stats = SearchStats()
+    goals_flags = grid.flags(goals)
+    if goals_flags[start_cell]:
+        stats.cost = 0
+        stats.mark("search")
+        return []
+
+    # Passes never run out of states over the threshold while the start's part of
+    # the maze is searched, so check that a goal can be reached at all first: the
+    # distance field says so, or else a flood fill taking a byte per cell, as the
+    # Manhattan distance ignores obstacles.
+    precomputed_distances = DISTANCE_FIELDS[distance](grid, goals)
+    if precomputed_distances[start_cell] == unreachable(grid) or \
+            (distance != "bfs" and not reaches_goal(grid, start_cell, goals_flags, bytearray(grid.blocked))):
+        stats.mark("precompute")
+        return []
+
+    creep_damage = grid.damage
+    inverted_creep_damage = InvertedDamage(grid)
+    min_creep_dmg = min(free_damages(grid), default=0)
+    flash_landings = grid.flash_landings() if max_flash > 0 else None
+    bounds = Bounds(bound, precomputed_distances, min_creep_dmg).table
+
+    # Successors as (f, path cost, state, actions), best first.
+    def successors(cur_cell: int, flashes: int, is_inverted: bool, path_cost: int) -> List[Tuple[int, int, Tuple, List[int]]]:
+        damage = inverted_creep_damage if is_inverted else creep_damage
+        next_states = []
+        for action_val, offset in enumerate(grid.offsets):
+            new_cell, move_cost = get_move_cost(cur_cell, offset, grid, damage)
+            if new_cell != cur_cell:
+                new_path_cost = path_cost + move_cost
+                next_states.append((new_path_cost + bounds(flashes > 0, is_inverted)[new_cell], new_path_cost,
+                                    (new_cell, flashes, is_inverted), [action_val]))
+            if flashes > 0:
+                flash_cell, flash_cost = get_flash_cost(cur_cell, offset, flash_landings[action_val], damage)
+                new_path_cost = path_cost + flash_cost
+                next_states.append((new_path_cost + bounds(flashes > 1, is_inverted)[flash_cell], new_path_cost,
+                                    (flash_cell, flashes - 1, is_inverted), [Action.FLASH.value, action_val]))
+        if not is_inverted:
+            next_states.append((path_cost + bounds(flashes > 0, True)[cur_cell], path_cost,
+                                (cur_cell, flashes, True), [Action.INVERSION.value]))
+        next_states.sort(key=lambda entry: entry[:2])
+        return next_states
+
+    start_state = (start_cell, max_flash, False)
+    threshold = bounds(max_flash > 0, False)[start_cell]
+    cache = TranspositionTable(cache_size)
+    expanded = pushes = pops = peak_path = passes = 0
+    stats.mark("precompute")
+
+    def report(cost: int) -> None:
+        stats.expanded, stats.pushes, stats.pops = expanded, pushes, pops
+        stats.peak_frontier, stats.passes, stats.cost = peak_path, passes, cost
+        stats.mark("search")
+
+    while threshold < UNSEEN:
+        passes += 1
+        cache.clear()
+        next_threshold = UNSEEN
+
+        # The current path: states, their successors left to try and the actions taken.
+        path = [start_state]
+        on_path = {start_state}
+        pending = [iter(successors(start_cell, max_flash, False, 0))]
+        actions = []
+        expanded += 1
+        pushes += 1
+        while pending:
+            entry = next(pending[-1], None)
+            if entry is None or entry[0] > threshold:
+                # Successors are sorted, so the rest are over the threshold too. Backtrack.
+                if entry is not None:
+                    next_threshold = min(next_threshold, entry[0])
+                pending.pop()
+                on_path.discard(path.pop())
+                pops += 1
+                if actions:
+                    actions.pop()
+                continue
+            _, new_path_cost, new_state, step_actions = entry
+            state_key = pack_state(*new_state, max_flash)
+            if new_state in on_path or cache.get(state_key, UNSEEN) <= new_path_cost:
+                continue
+            if goals_flags[new_state[0]]:
+                report(new_path_cost)
+                return [action for taken in actions for action in taken] + step_actions
+            cache[state_key] = new_path_cost
+            expanded += 1
+            path.append(new_state)
+            on_path.add(new_state)
+            pushes += 1
+            peak_path = max(peak_path, len(path))
+            pending.append(iter(successors(*new_state, new_path_cost)))
+            actions.append(step_actions)
+        threshold = next_threshold
+
+    report(None)
+    return []
+ 
+def search(dct: Dict, queue: str = "heap", stats: SearchStats = None, distance: str = "manhattan", bound: str = "flash",
+           weight: float = 1.0, iterative: bool = False, cache_size: int = 1 << 12) -> List[int]:
     """
     Solve the maze using A* search.
+
+    queue selects the priority queue, "heap" or Dial's "bucket" queue.
+    stats, if given, is filled with what the search did (see stats.SearchStats).
+    distance selects the heuristic distance field, "manhattan" or obstacle-aware "bfs".
+    bound selects the heuristic, "flash" (step cost, flash and inversion aware) or the
+    original "creep" one.
+    weight above 1 runs weighted A*, f = g + weight * h, returning a path costing at
+    most weight times the optimal cost, usually after far fewer expansions.
+    With iterative set, runs IDA* instead, which only keeps the current path and a
+    table of cache_size states in memory (queue and weight are then unused).
  
     Write your implementation below
     """
-    # Get columns and rows.
-    columns = dct["cols"]
-    rows = dct["rows"]
- 
-    # Set obstacles.
-    obstacles_set = set(tuple(obs) for obs in dct["obstacles"])
- 
-    # Get creeps into dictionary to remove duplicates at same position (in order),
-    # then convert to list.
-    creeps_dict = {(x, y): num for (x, y, num) in dct["creeps"]}
-    creeps_list = [(x, y, num) for (x,y), num in creeps_dict.items()]
+    if stats is None:
+        stats = SearchStats()
+    stats.start()
+
+    # Encode the maze (rows, columns, obstacles and creeps) as a flat grid.
+    # Creeps at the same position replace earlier ones (in order).
+    grid = Grid.from_dict(dct)
+    stats.mark("precompute")
     
     # Set starting position.
-    start_pos = tuple(dct["start"])
+    start_cell = grid.cell(*dct["start"])
  
     # Set goals.
-    goals_set = set(tuple(goal) for goal in dct["goals"])
+    goals = [tuple(goal) for goal in dct["goals"]]
  
     # Get max flash num.
     max_flash = dct["num_flash_left"]
  
-    return run_a_star(columns, rows, obstacles_set, creeps_list, start_pos, goals_set, max_flash)
+    if iterative:
+        return run_ida_star(grid, start_cell, goals, max_flash, cache_size, stats, distance, bound)
+    return run_a_star(grid, start_cell, goals, max_flash, queue, stats, distance, bound, weight)
+
+def anytime_search(dct: Dict, time_limit: float, weight: float = 3.0, weight_step: float = 0.5, queue: str = "heap",
+                   stats: SearchStats = None, distance: str = "manhattan", bound: str = "flash") -> Iterator[List[int]]:
+    """
+    Solve the maze with Anytime Repairing A* (ARA*), yielding the actions of
+    progressively cheaper paths, in the same format as search, until the path is
+    optimal or time_limit seconds have passed. Nothing is yielded if no goal can
+    be reached in time.
+
+    weight is the starting weighted A* weight, lowered by weight_step after each
+    pass. Every path yielded costs at most the current weight times the optimal cost.
+    stats, if given, is filled with the weight and cost of the last path yielded and
+    what the search did up to then (see stats.SearchStats).
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.start()
+    grid = Grid.from_dict(dct)
+    stats.mark("precompute")
+    start_cell = grid.cell(*dct["start"])
+    goals = [tuple(goal) for goal in dct["goals"]]
+    yield from run_ara_star(grid, start_cell, goals, dct["num_flash_left"], time_limit, weight, weight_step, queue, stats, distance, bound)
@@ -0,0 +1,124 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import importlib
+import os
+from cache import LRUCache
+from grid import Grid
+
+# Batch maze solving across a process pool.
+# Inputs sharing the same maze (the same obstacles and creeps lists) are split into
+# one maze and small per-task queries (start, goals, flashes). The queries are
+# sharded across the workers grouped by maze, and each maze is sent to a worker
+# only with the first of its queries there, and dropped after the last. Each worker
+# builds the grid for a maze once and reuses it, with its flash jump table, for
+# every query on that maze.
+
+ALGORITHMS = ("astar", "bfs", "dfs", "ucs")
+
+# Search inputs describing the maze itself, everything else is part of the query.
+# Mazes loaded by loader.load_maze come as a prebuilt grid instead of obstacles and creeps.
+MAZE_KEYS = ("rows", "cols", "obstacles", "creeps", "grid")
+
+# Most grids each worker keeps built.
+GRID_CACHE_SIZE = 4
+
+# Maze dictionaries a worker still has queries for, and their grids, reset by _init_worker.
+_mazes: Dict[int, Dict] = {}
+_grids = LRUCache(GRID_CACHE_SIZE)
+
+# A task is the algorithm, maze index, the maze itself if the worker does not have
+# it yet (else None), the query, and whether it is the maze's last query there.
+Task = Tuple[str, int, Optional[Dict], Dict, bool]
+
+def _init_worker() -> None:
+    global _mazes, _grids
+    _mazes = {}
+    _grids = LRUCache(GRID_CACHE_SIZE)
+
+def _solve(task: Task) -> List:
+    algorithm, maze_index, maze, query, last = task
+    if maze is not None:
+        _mazes[maze_index] = maze
+    maze = _mazes.pop(maze_index) if last else _mazes[maze_index]
+    grid = _grids.get(maze_index)
+    if grid is None:
+        grid = Grid.from_dict(maze)
+        _grids[maze_index] = grid
+    dct = dict(maze, grid=grid, **query)
+    return importlib.import_module(algorithm).search(dct)
+
+def _solve_chunk(tasks: List[Task]) -> List[List]:
+    return [_solve(task) for task in tasks]
+
+def split_mazes(dcts: Iterable[Dict]) -> Tuple[List[Dict], List[Tuple[int, Dict]]]:
+    # Splits search inputs into the distinct mazes and (maze index, query) pairs.
+    mazes = []
+    queries = []
+    maze_index = {}
+    for dct in dcts:
+        # Prebuilt grids stand for their maze, rows and cols being optional with them.
+        grid = dct.get("grid")
+        if grid is not None:
+            key = (grid.rows, grid.cols, id(grid))
+        else:
+            key = (dct["rows"], dct["cols"], id(dct.get("obstacles")), id(dct.get("creeps")))
+        if key not in maze_index:
+            maze_index[key] = len(mazes)
+            mazes.append({k: dct[k] for k in MAZE_KEYS if k in dct})
+        queries.append((maze_index[key], {k: v for k, v in dct.items() if k not in MAZE_KEYS}))
+    return mazes, queries
+
+def shard_tasks(algorithm: str, mazes: List[Dict], queries: List[Tuple[int, Dict]], shards: int) -> List[Tuple[List[int], List[Task]]]:
+    # Splits the queries into shards of about equal size, grouped by maze, returning
+    # each shard's input positions and tasks. A maze is only attached to its first
+    # task in a shard, and marked done on its last.
+    order = sorted(range(len(queries)), key=lambda position: queries[position][0])
+    split = []
+    for k in range(shards):
+        positions = order[k * len(order) // shards:(k + 1) * len(order) // shards]
+        maze_indices = [queries[position][0] for position in positions]
+        tasks = []
+        for j, position in enumerate(positions):
+            maze_index, query = queries[position]
+            first = j == 0 or maze_indices[j - 1] != maze_index
+            last = j == len(positions) - 1 or maze_indices[j + 1] != maze_index
+            tasks.append((algorithm, maze_index, mazes[maze_index] if first else None, query, last))
+        split.append((positions, tasks))
+    return split
+
+def solve_many(dcts: Iterable[Dict], algorithm: str = "astar", workers: int = None, chunksize: int = 16) -> Iterator[List]:
+    """
+    Solve many mazes with the search() of the named algorithm module, fanning
+    out across workers processes (all CPUs by default, in-process if 1).
+
+    Yields each result as it is ready, in the same order as the inputs.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+    mazes, queries = split_mazes(dcts)
+    workers = min(workers or os.cpu_count() or 1, len(queries))
+
+    if workers <= 1:
+        _init_worker()
+        _mazes.update(enumerate(mazes))
+        for maze_index, query in queries:
+            yield _solve((algorithm, maze_index, None, query, False))
+        return
+
+    # One single process pool per shard, so each shard's tasks run in order on the
+    # worker that was sent their maze.
+    pools = [ProcessPoolExecutor(max_workers=1, initializer=_init_worker) for _ in range(workers)]
+    try:
+        # The future of the chunk holding each input's result, and its place in the chunk.
+        located = [None] * len(queries)
+        for pool, (positions, tasks) in zip(pools, shard_tasks(algorithm, mazes, queries, workers)):
+            for start in range(0, len(tasks), chunksize):
+                future = pool.submit(_solve_chunk, tasks[start:start + chunksize])
+                for offset, position in enumerate(positions[start:start + chunksize]):
+                    located[position] = (future, offset)
+        for future, offset in located:
+            yield future.result()[offset]
+    finally:
+        for pool in pools:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,69 @@
+# Runs astar.anytime_search with a small time limit on creep maps with flashes,
+# printing when each path was yielded and its cost against the optimal one.
+#
+# Every path is replayed to check its cost. A path must be yielded however small
+# the time limit (the first weighted pass always finishes), each costing less than
+# the one before, and at most its weight times the optimal cost where that is known.
+#
+# Usage: python bench_anytime.py [--limit seconds] [--optimal-size size] [size ...]
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import astar
+from bench_suite import replay_cost
+from grid import Grid
+from stats import SearchStats
+from mazes import creep_field
+
+def main(sizes: List[int], limit: float, optimal_size: int) -> int:
+    print(f"{'size':>6} {'path':>5} {'time (s)':>9} {'weight':>7} {'cost':>7} {'optimal':>8} checks")
+    problems = False
+    for size in sizes:
+        dct = creep_field(size, size, flashes=2, seed=size)
+        grid = Grid.from_dict(dct)
+        optimal = None
+        if size <= optimal_size:
+            check = SearchStats()
+            astar.search(dct, stats=check)
+            optimal = check.cost
+
+        stats = SearchStats()
+        start = time.perf_counter()
+        costs = []
+        for count, actions in enumerate(astar.anytime_search(dct, limit, stats=stats), 1):
+            elapsed = time.perf_counter() - start
+            checking = time.perf_counter()
+            found = []
+            cost, problem = replay_cost(grid, dct, actions)
+            if problem:
+                found.append(problem)
+            elif cost != stats.cost:
+                found.append(f"replayed cost {cost}, reported {stats.cost}")
+            if costs and stats.cost >= costs[-1]:
+                found.append(f"no cheaper than the last path, {costs[-1]}")
+            if optimal is not None and stats.cost > stats.weight * optimal:
+                found.append(f"over {stats.weight} times the optimal cost")
+            costs.append(stats.cost)
+            problems = problems or bool(found)
+            print(f"{size:>6} {count:>5} {elapsed:>9.3f} {stats.weight:>7.2f} {stats.cost:>7} {str(optimal):>8} "
+                  f"{'; '.join(found) or 'ok'}")
+            start += time.perf_counter() - checking  # Leave out the time spent checking.
+        if not costs:
+            problems = True
+            print(f"{size:>6} {'-':>5} {time.perf_counter() - start:>9.3f} {'-':>7} {'-':>7} {str(optimal):>8} "
+                  f"no path yielded")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the paths astar.anytime_search yields in a small time limit.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[100, 200, 400])
+    parser.add_argument("--limit", type=float, default=0.05, help="seconds given to each search")
+    parser.add_argument("--optimal-size", type=int, default=200,
+                        help="largest size the optimal cost is found for, with astar.search")
+    args = parser.parse_args()
+    sys.exit(main(args.sizes, args.limit, args.optimal_size))
@@ -0,0 +1,63 @@
+# Compares peak RSS of BFS storing a path per queue entry against parent pointers.
+#
+# Usage: python bench_bfs_memory.py [size ...]
+# Each variant runs in its own process so peak RSS is measured independently.
+import os
+import resource
+import subprocess
+import sys
+from collections import deque
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bfs
+from grid import Grid
+from mazes import open_field
+
+def path_list_bfs(grid: Grid, start_cell: int, goals: bytearray) -> List[int]:
+    # BFS as it was before parent pointers, copying the path into every queue entry.
+    if goals[start_cell]:
+        return []
+    visited = bytearray(grid.blocked)
+    visited[start_cell] = 1
+    queue = deque([(start_cell, [])])
+    while queue:
+        cur_cell, path = queue.popleft()
+        for action_val, offset in enumerate(grid.offsets):
+            new_cell = cur_cell + offset
+            if not visited[new_cell]:
+                new_path = path + [action_val]
+                if goals[new_cell]:
+                    return new_path
+                queue.append((new_cell, new_path))
+                visited[new_cell] = 1
+    return []
+
+def peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def run_variant(variant: str, size: int) -> None:
+    dct = open_field(size, size)
+    before = peak_rss_kb()
+    if variant == "path_lists":
+        grid = Grid.from_dict(dct, with_creeps=False)
+        path = path_list_bfs(grid, grid.cell(*dct["start"]), grid.flags(dct["goals"]))
+    else:
+        path = bfs.search(dct)
+    print(before, peak_rss_kb(), len(path))
+
+def main(sizes: List[int]) -> None:
+    print(f"{'size':>6} {'variant':>12} {'path len':>9} {'peak RSS (MB)':>14} {'search delta (MB)':>18}")
+    for size in sizes:
+        for variant in ("path_lists", "parents"):
+            output = subprocess.run([sys.executable, __file__, "--child", variant, str(size)],
+                                    capture_output=True, text=True, check=True).stdout
+            before, after, length = map(int, output.split())
+            print(f"{size:>6} {variant:>12} {length:>9} {after / 1024:>14.1f} {(after - before) / 1024:>18.1f}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        run_variant(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [250, 500, 1000])
@@ -0,0 +1,55 @@
+# Compares the tracemalloc peak and time of dfs.search against its iterative
+# deepening mode, which must find a shortest path (as long as bfs.search's) in
+# less memory than the plain DFS on mazes where a goal can be reached.
+#
+# Usage: python bench_dfs_memory.py [size ...]
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bfs
+import dfs
+from mazes import open_field, random_obstacles, rooms
+
+FAMILIES = {
+    "open": lambda size: open_field(size, size),
+    "rooms": lambda size: rooms(size, size, seed=size),
+    "sparse": lambda size: random_obstacles(size, size, density=0.1, seed=size),
+    "dense": lambda size: random_obstacles(size, size, density=0.3, seed=1),
+}
+
+def measure(search: Callable) -> Tuple[List, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = search()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return path, elapsed, peak
+
+def main(sizes: List[int]) -> int:
+    print(f"{'size':>6} {'maze':>7} {'search':>6} {'path len':>9} {'time (s)':>9} {'peak (KB)':>10} checks")
+    problems = False
+    for size in sizes:
+        for family, make_maze in FAMILIES.items():
+            dct = make_maze(size)
+            moves = len(bfs.search(dct))
+            dfs_path, dfs_time, dfs_peak = measure(lambda: dfs.search(dct))
+            path, elapsed, peak = measure(lambda: dfs.search(dct, iterative=True))
+            found = []
+            if len(path) != (moves + 1 if moves else len(dfs_path)):
+                found.append(f"path length {len(path)}, bfs {moves + 1}")
+            if dfs_path and peak >= dfs_peak:
+                found.append("peak memory over dfs")
+            problems = problems or bool(found)
+            print(f"{size:>6} {family:>7} {'dfs':>6} {len(dfs_path):>9} {dfs_time:>9.3f} {dfs_peak / 1024:>10.1f}")
+            print(f"{size:>6} {family:>7} {'iddfs':>6} {len(path):>9} {elapsed:>9.3f} {peak / 1024:>10.1f} "
+                  f"{'; '.join(found) or 'ok'}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or [60, 120, 300]))
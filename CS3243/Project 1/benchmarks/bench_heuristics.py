@@ -0,0 +1,34 @@
+# Compares states expanded by astar.search with the original "creep" heuristic
+# against the flash-aware "flash" lower bound, for both distance fields, on
+# creep maps and room-style mazes.
+#
+# Usage: python bench_heuristics.py [size ...]
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import astar
+from stats import SearchStats
+from mazes import creep_field, rooms
+
+def main(sizes: List[int]) -> None:
+    print(f"{'size':>6} {'maze':>6} {'distance':>9} {'bound':>6} {'expanded':>10} {'prep (s)':>9} {'time (s)':>9} {'cost':>7}")
+    for size in sizes:
+        room_maze = rooms(size, size, seed=size)
+        room_maze["num_flash_left"] = 2
+        for maze_name, dct in (("creeps", creep_field(size, size, seed=size)), ("rooms", room_maze)):
+            costs = set()
+            for distance in ("manhattan", "bfs"):
+                for bound in ("creep", "flash"):
+                    stats = SearchStats()
+                    astar.search(dct, stats=stats, distance=distance, bound=bound)
+                    costs.add(stats.cost)
+                    print(f"{size:>6} {maze_name:>6} {distance:>9} {bound:>6} {stats.expanded:>10} "
+                          f"{stats.precompute_time:>9.2f} {stats.search_time:>9.2f} {str(stats.cost):>7}")
+            if len(costs) != 1:
+                print("  warning: path costs differ")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50, 100, 200])
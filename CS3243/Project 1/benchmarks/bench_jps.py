@@ -0,0 +1,36 @@
+# Compares nodes expanded by uniform-cost search and Jump Point Search
+# on open-field and room-style mazes.
+#
+# Usage: python bench_jps.py [size ...]
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pqueue
+import ucs
+from bench_queues import counting
+from mazes import open_field, rooms
+
+def main(sizes: List[int]) -> None:
+    pqueue.QUEUES["heap"] = counting(pqueue.QUEUES["heap"])
+    queue_class = pqueue.QUEUES["heap"]
+
+    print(f"{'size':>6} {'maze':>6} {'search':>5} {'pops':>10} {'time (s)':>9} {'path len':>9}")
+    for size in sizes:
+        for maze_name, dct in (("open", open_field(size, size)), ("rooms", rooms(size, size, seed=size))):
+            lengths = set()
+            for name, jump_point in (("ucs", False), ("jps", True)):
+                queue_class.pops = 0
+                start = time.perf_counter()
+                path = ucs.search(dct, jump_point=jump_point)
+                elapsed = time.perf_counter() - start
+                lengths.add(len(path))
+                print(f"{size:>6} {maze_name:>6} {name:>5} {queue_class.pops:>10} {elapsed:>9.2f} {len(path):>9}")
+            if len(lengths) != 1:
+                print("  warning: path lengths differ")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 300, 1000])
@@ -0,0 +1,60 @@
+# Compares load time and peak memory of json.load plus Grid.from_dict against the
+# streaming loader.load_maze, for the usual obstacle list and the run-length and
+# bitmap encodings, on random obstacle mazes.
+#
+# Usage: python bench_loader.py [size ...]
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import loader
+from grid import Grid
+from mazes import random_obstacles
+
+def load_json(path: str) -> Grid:
+    with open(path) as file:
+        return Grid.from_dict(json.load(file))
+
+def measure(load: Callable[[str], object], path: str):
+    # Time is measured without tracemalloc, which slows allocations down.
+    start = time.perf_counter()
+    load(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    load(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main(sizes: List[int]) -> None:
+    print(f"{'size':>6} {'format':>9} {'loader':>7} {'file (MB)':>10} {'time (s)':>9} {'peak (MB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            dct = random_obstacles(size, size, density=0.3, seed=size)
+            grid = Grid.from_dict(dct)
+            encodings = (
+                ("list", {}),
+                ("runs", {"obstacles": None, "obstacle_runs": loader.obstacle_runs(grid)}),
+                ("bitmap", {"obstacles": None, "obstacle_bitmap": loader.obstacle_bitmap(grid)}),
+            )
+            for name, changes in encodings:
+                encoded = {key: value for key, value in dict(dct, **changes).items() if value is not None}
+                path = os.path.join(directory, f"{name}_{size}.json")
+                with open(path, "w") as file:
+                    json.dump(encoded, file)
+                file_size = os.path.getsize(path) / 2 ** 20
+                loaders = [("stream", loader.load_maze)]
+                if name == "list":
+                    loaders.insert(0, ("json", load_json))
+                for loader_name, load in loaders:
+                    elapsed, peak = measure(load, path)
+                    print(f"{size:>6} {name:>9} {loader_name:>7} {file_size:>10.1f} {elapsed:>9.2f} {peak / 2 ** 20:>10.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [500, 1000, 2000])
@@ -0,0 +1,52 @@
+# Compares node throughput of the binary heap against Dial's bucket queue
+# for ucs.search and astar.search on large creep maps.
+#
+# Usage: python bench_queues.py [size ...]
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import astar
+import pqueue
+import ucs
+from mazes import creep_field
+
+def counting(queue_class):
+    # Wraps a queue class to count pops, i.e. nodes taken off the frontier.
+    class CountingQueue(queue_class):
+        pops = 0
+
+        def __init__(self):
+            super().__init__()
+            pop = self.pop
+
+            def counted_pop():
+                CountingQueue.pops += 1
+                return pop()
+            self.pop = counted_pop
+    return CountingQueue
+
+def main(sizes: List[int]) -> None:
+    for kind in ("heap", "bucket"):
+        pqueue.QUEUES[kind] = counting(pqueue.QUEUES[kind])
+
+    print(f"{'size':>6} {'search':>6} {'queue':>7} {'pops':>10} {'time (s)':>9} {'pops/s':>10}")
+    for size in sizes:
+        dct = creep_field(size, size, seed=size)
+        for name, module in (("ucs", ucs), ("astar", astar)):
+            results = {}
+            for kind in ("heap", "bucket"):
+                queue_class = pqueue.QUEUES[kind]
+                queue_class.pops = 0
+                start = time.perf_counter()
+                results[kind] = module.search(dct, queue=kind)
+                elapsed = time.perf_counter() - start
+                print(f"{size:>6} {name:>6} {kind:>7} {queue_class.pops:>10} {elapsed:>9.2f} {queue_class.pops / elapsed:>10.0f}")
+            if name == "ucs" and len(results["heap"]) != len(results["bucket"]):
+                print("  warning: ucs path lengths differ")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [200, 400, 800])
@@ -0,0 +1,256 @@
+# Runs bfs, dfs, ucs and astar over seeded maze families at several sizes,
+# checks every path returned, and writes the results as JSON so runs on
+# different versions can be compared.
+#
+# Every path is checked to be legal and to end on a goal. Path lengths of bfs
+# and ucs, both shortest in moves, must agree, and the astar path cost replayed
+# from its actions must match the cost it reports and, on mazes up to ORACLE_SIZE
+# a side, the cheapest cost found by a plain Dijkstra search.
+#
+# Per search the results have the wall time, precompute and search time, the
+# tracemalloc peak (from a second run, as tracing slows allocations down) and
+# the counts in stats.SearchStats.
+#
+# Usage: python bench_suite.py [-o results.json] [--compare old.json] [--no-memory] [size ...]
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from heapq import heappop, heappush
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import astar
+import bfs
+import dfs
+import ucs
+from grid import Grid
+from stats import SearchStats
+from mazes import creep_field, open_field, random_obstacles, rooms, scattered_goals, spiral
+
+# Maze families, each making the maze of a given size.
+FAMILIES = {
+    "open": lambda size: open_field(size, size),
+    "rooms": lambda size: rooms(size, size, seed=size),
+    "spiral": lambda size: spiral(size, size),
+    "sparse": lambda size: random_obstacles(size, size, density=0.1, seed=size),
+    "dense": lambda size: random_obstacles(size, size, density=0.25, seed=size),
+    "creeps": lambda size: creep_field(size, size, creep_density=0.9, seed=size),
+    "goals": lambda size: scattered_goals(size, size, goals=size, seed=size),
+    "flash": lambda size: creep_field(size, size, flashes=8, seed=size),
+}
+
+# Largest maze side the astar cost is checked against dijkstra_cost on.
+ORACLE_SIZE = 50
+
+SEARCHES = {
+    "bfs": bfs.search,
+    "dfs": dfs.search,
+    "ucs": ucs.search,
+    "astar": astar.search,
+}
+
+def measure(search: Callable, dct: Dict, memory: bool) -> Tuple[object, SearchStats, float, Optional[int]]:
+    # Returns the path, stats and wall time of one run, and the tracemalloc peak of another.
+    stats = SearchStats()
+    start = time.perf_counter()
+    path = search(dct, stats=stats)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        search(dct)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return path, stats, elapsed, peak
+
+# Problems with a path of (row, col) positions, as dfs and ucs return.
+def check_positions(grid: Grid, dct: Dict, path: List) -> List[str]:
+    if not path:
+        return []
+    goals = grid.flags(dct["goals"])
+    cells = [grid.cell(*pos) for pos in path]
+    if tuple(path[0]) != tuple(dct["start"]):
+        return ["path does not begin at the start"]
+    for cur_cell, new_cell in zip(cells, cells[1:]):
+        if new_cell - cur_cell not in grid.offsets or grid.blocked[new_cell]:
+            return [f"illegal move to {grid.pos(new_cell)}"]
+    if not goals[cells[-1]]:
+        return ["path does not end on a goal"]
+    return []
+
+# Problems with a path of move actions, as bfs returns.
+def check_moves(grid: Grid, dct: Dict, actions: List[int]) -> List[str]:
+    if not actions:
+        return []
+    cur_cell = grid.cell(*dct["start"])
+    for action_val in actions:
+        cur_cell += grid.offsets[action_val]
+        if grid.blocked[cur_cell]:
+            return [f"illegal move to {grid.pos(cur_cell)}"]
+    if not grid.flags(dct["goals"])[cur_cell]:
+        return ["path does not end on a goal"]
+    return []
+
+# Replays astar actions, returning the path cost, or None with the problem found.
+def replay_cost(grid: Grid, dct: Dict, actions: List[int]) -> Tuple[Optional[int], str]:
+    cur_cell = grid.cell(*dct["start"])
+    flashes = dct["num_flash_left"]
+    damage = grid.damage
+    cost = 0
+    moves = iter(actions)
+    for action_val in moves:
+        if action_val == astar.Action.INVERSION.value:
+            if damage is not grid.damage:
+                return None, "inverted twice"
+            damage = astar.inversion(grid)
+        elif action_val == astar.Action.FLASH.value:
+            offset = grid.offsets[next(moves)]
+            if not flashes:
+                return None, "flashed with no flashes left"
+            flashes -= 1
+            steps = 0
+            while not grid.blocked[cur_cell + offset]:
+                cur_cell += offset
+                steps += 1
+            cost += 2 * steps + 10 + damage[cur_cell]
+        else:
+            new_cell = cur_cell + grid.offsets[action_val]
+            if not grid.blocked[new_cell]:
+                cur_cell = new_cell
+                cost += 4 + damage[cur_cell]
+    if not grid.flags(dct["goals"])[cur_cell]:
+        return None, "path does not end on a goal"
+    return cost, ""
+
+# Cheapest astar path cost, by Dijkstra's algorithm over (cell, flashes left, inverted)
+# states with no heuristic, or None if no goal can be reached.
+def dijkstra_cost(grid: Grid, dct: Dict) -> Optional[int]:
+    goals = grid.flags(dct["goals"])
+    damages = (grid.damage, astar.inversion(grid))
+    start = (grid.cell(*dct["start"]), dct["num_flash_left"], 0)
+    costs = {start: 0}
+    queue = [(0, start)]
+    while queue:
+        cost, state = heappop(queue)
+        if cost > costs[state]:
+            continue
+        cur_cell, flashes, inverted = state
+        if goals[cur_cell]:
+            return cost
+        damage = damages[inverted]
+        successors = [] if inverted else [((cur_cell, flashes, 1), cost)]
+        for offset in grid.offsets:
+            if not grid.blocked[cur_cell + offset]:
+                successors.append(((cur_cell + offset, flashes, inverted), cost + 4 + damage[cur_cell + offset]))
+            if flashes:
+                new_cell, steps = cur_cell, 0
+                while not grid.blocked[new_cell + offset]:
+                    new_cell += offset
+                    steps += 1
+                successors.append(((new_cell, flashes - 1, inverted), cost + 2 * steps + 10 + damage[new_cell]))
+        for new_state, new_cost in successors:
+            if new_cost < costs.get(new_state, new_cost + 1):
+                costs[new_state] = new_cost
+                heappush(queue, (new_cost, new_state))
+    return None
+
+def goal_start(grid: Grid, dct: Dict) -> bool:
+    return bool(grid.flags(dct["goals"])[grid.cell(*dct["start"])])
+
+def run_maze(family: str, size: int, memory: bool) -> List[Dict]:
+    dct = FAMILIES[family](size)
+    grid = Grid.from_dict(dct)
+    results = []
+    for name, search in SEARCHES.items():
+        path, stats, elapsed, peak = measure(search, dct, memory)
+        result = {
+            "family": family,
+            "size": size,
+            "search": name,
+            "time": elapsed,
+            "peak_memory": peak,
+            **stats.as_dict(),
+        }
+        if name == "astar":
+            cost, problem = replay_cost(grid, dct, path)
+            result["path_length"] = len(path)
+            result["problems"] = [problem] if problem and stats.cost is not None else []
+            if stats.cost is not None and not problem:
+                if cost != stats.cost:
+                    result["problems"].append(f"replayed cost {cost}, reported {stats.cost}")
+                if size <= ORACLE_SIZE:
+                    cheapest = dijkstra_cost(grid, dct)
+                    if stats.cost != cheapest:
+                        result["problems"].append(f"cost {stats.cost}, cheapest {cheapest}")
+        elif name == "bfs":
+            result["path_length"] = len(path)
+            result["problems"] = check_moves(grid, dct, path)
+        else:
+            result["path_length"] = max(len(path) - 1, 0)
+            result["problems"] = check_positions(grid, dct, path)
+        results.append(result)
+
+    # bfs and ucs both find a path with the fewest moves, and astar finds one
+    # whenever they do.
+    by_search = {result["search"]: result for result in results}
+    if by_search["bfs"]["path_length"] != by_search["ucs"]["path_length"]:
+        by_search["ucs"]["problems"].append(f"path length {by_search['ucs']['path_length']}, "
+                                            f"bfs {by_search['bfs']['path_length']}")
+    if (by_search["astar"]["cost"] is None) != (by_search["bfs"]["path_length"] == 0 and not goal_start(grid, dct)):
+        by_search["astar"]["problems"].append("disagrees with bfs on whether a goal can be reached")
+    return results
+
+# Prints time and expansion ratios against an earlier run, worst first.
+def compare(results: List[Dict], path: str) -> None:
+    with open(path) as file:
+        baseline = {(r["family"], r["size"], r["search"]): r for r in json.load(file)["results"]}
+    rows = []
+    for result in results:
+        old = baseline.get((result["family"], result["size"], result["search"]))
+        if old is not None and old["time"] > 0:
+            expanded = result["expanded"] / old["expanded"] if old["expanded"] else 1.0
+            rows.append((result["time"] / old["time"], expanded, result))
+    print(f"{'family':>8} {'size':>6} {'search':>6} {'time x':>7} {'expanded x':>11}", file=sys.stderr)
+    for time_ratio, expanded_ratio, result in sorted(rows, key=lambda row: -row[0]):
+        print(f"{result['family']:>8} {result['size']:>6} {result['search']:>6} {time_ratio:>7.2f} {expanded_ratio:>11.2f}",
+              file=sys.stderr)
+
+def main(sizes: List[int], output: Optional[str], baseline: Optional[str], memory: bool) -> int:
+    print(f"{'size':>6} {'family':>8} {'search':>6} {'length':>7} {'expanded':>9} {'time':>10} checks", file=sys.stderr)
+    results = []
+    for size in sizes:
+        for family in FAMILIES:
+            for result in run_maze(family, size, memory):
+                results.append(result)
+                status = "; ".join(result["problems"]) or "ok"
+                print(f"{size:>6} {family:>8} {result['search']:>6} {result['path_length']:>7} {result['expanded']:>9} "
+                      f"{result['time']:>9.3f}s {status}", file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "sizes": sizes,
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+    if baseline:
+        compare(results, baseline)
+    return 1 if any(result["problems"] for result in results) else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Project 1 searches on generated mazes.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[25, 50, 100])
+    parser.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    args = parser.parse_args()
+    sys.exit(main(args.sizes, args.output, args.compare, not args.no_memory))
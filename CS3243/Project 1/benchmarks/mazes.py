@@ -0,0 +1,97 @@
+from typing import Dict, List
+import random
+
+# Seeded maze generators for the benchmarks, returning the usual search input dictionary.
+
+def _maze(rows: int, cols: int, obstacles: List[List[int]], goals: int = 1) -> Dict:
+    # Places the start at the first free cell and the goals at the last free cells.
+    blocked = {(x, y) for x, y in obstacles}
+    cells = ((x, y) for x in range(rows) for y in range(cols))
+    start = next(pos for pos in cells if pos not in blocked)
+    cells = ((x, y) for x in reversed(range(rows)) for y in reversed(range(cols)))
+    goal_list = [list(pos) for pos, _ in zip((pos for pos in cells if pos not in blocked), range(goals))]
+    return {
+        "rows": rows,
+        "cols": cols,
+        "obstacles": obstacles,
+        "creeps": [],
+        "start": list(start),
+        "goals": goal_list,
+        "num_flash_left": 0,
+    }
+
+def open_field(rows: int, cols: int, seed: int = 0, goals: int = 1) -> Dict:
+    # No obstacles at all.
+    return _maze(rows, cols, [], goals)
+
+def random_obstacles(rows: int, cols: int, density: float = 0.2, seed: int = 0, goals: int = 1) -> Dict:
+    # Each cell is an obstacle with the given probability, except the corners.
+    rng = random.Random(seed)
+    obstacles = [[x, y] for x in range(rows) for y in range(cols)
+                 if rng.random() < density and (x, y) not in ((0, 0), (rows - 1, cols - 1))]
+    return _maze(rows, cols, obstacles, goals)
+
+def creep_field(rows: int, cols: int, density: float = 0.1, creep_density: float = 0.5,
+                max_creeps: int = 9, flashes: int = 2, seed: int = 0, goals: int = 1) -> Dict:
+    # Random obstacles plus creeps on a share of the cells, for the A* model.
+    rng = random.Random(seed)
+    dct = random_obstacles(rows, cols, density, seed, goals)
+    dct["creeps"] = [[x, y, rng.randint(1, max_creeps)] for x in range(rows) for y in range(cols)
+                     if rng.random() < creep_density]
+    dct["num_flash_left"] = flashes
+    return dct
+
+def rooms(rows: int, cols: int, room_size: int = 20, doors: int = 2, seed: int = 0, goals: int = 1) -> Dict:
+    # Square rooms separated by one-cell walls, with a few random doors in each wall segment.
+    rng = random.Random(seed)
+    walls = set()
+    for x in range(room_size, rows, room_size + 1):
+        walls.update((x, y) for y in range(cols))
+    for y in range(room_size, cols, room_size + 1):
+        walls.update((x, y) for x in range(rows))
+
+    # Open doors along every wall segment between two rooms.
+    for x in range(room_size, rows, room_size + 1):
+        for first in range(0, cols, room_size + 1):
+            segment = range(first, min(first + room_size, cols))
+            for y in rng.sample(list(segment), min(doors, len(segment))):
+                walls.discard((x, y))
+    for y in range(room_size, cols, room_size + 1):
+        for first in range(0, rows, room_size + 1):
+            segment = range(first, min(first + room_size, rows))
+            for x in rng.sample(list(segment), min(doors, len(segment))):
+                walls.discard((x, y))
+    return _maze(rows, cols, [[x, y] for x, y in sorted(walls)], goals)
+
+def spiral(rows: int, cols: int, seed: int = 0, goals: int = 1) -> Dict:
+    # One-cell corridor winding in from the start corner to the middle, with
+    # one-cell walls between its arms. The goals are at the end of the corridor.
+    carved = [(0, 0)]
+    x, y = 0, 0
+    moves = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # right, down, left, up
+    turn = 0
+    while True:
+        # Legs run cols - 1, rows - 1, cols - 1, rows - 3, cols - 3, rows - 5, ...
+        length = cols - 1 - max(0, turn - 2) if turn % 2 == 0 else rows - turn
+        if length <= 0:
+            break
+        dx, dy = moves[turn % 4]
+        for _ in range(length):
+            x, y = x + dx, y + dy
+            carved.append((x, y))
+        turn += 1
+    free = set(carved)
+    dct = _maze(rows, cols, [[x, y] for x in range(rows) for y in range(cols) if (x, y) not in free])
+    dct["goals"] = [list(pos) for pos in carved[:-goals - 1:-1]]
+    return dct
+
+def scattered_goals(rows: int, cols: int, goals: int = 100, density: float = 0.2, seed: int = 0) -> Dict:
+    # Random obstacles with the goals spread over random free cells rather than
+    # packed into the last ones.
+    rng = random.Random(seed)
+    dct = random_obstacles(rows, cols, density, seed)
+    blocked = {(x, y) for x, y in dct["obstacles"]}
+    blocked.add(tuple(dct["start"]))
+    free = [[x, y] for x in range(rows) for y in range(cols) if (x, y) not in blocked]
+    dct["goals"] = rng.sample(free, min(goals, len(free)))
+    return dct
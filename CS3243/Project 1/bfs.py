@@ -1,13 +1,8 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List
 from collections import deque
 from enum import Enum
-
-DIRECTIONS = [
-    (-1, 0), # UP
-    (1, 0),  # DOWN
-    (0, -1), # LEFT
-    (0, 1)  # RIGHT
-]
+from grid import Grid, bidirectional_search, build_actions, path_actions
+from stats import SearchStats
 
 class Action(Enum):
     UP = 0
@@ -17,74 +12,92 @@ class Action(Enum):
     FLASH = 4
     INVERSION = 5
 
-def search(dct: Dict) -> List[int]:
+def search(dct: Dict, bidirectional: bool = False, stats: SearchStats = None) -> List[int]:
     """
     Solve the maze using breadth-first search.
 
+    With bidirectional set, searches from the start and from all goals at once
+    and meets in the middle, returning a shortest path in the same format.
+    stats, if given, is filled with what the search did (see stats.SearchStats).
+
     Write your implementation below
     """
     # Creeps and flash can be ignored since no cost involved in BFS.
     # Can traverse tree without considering creep cost, just need to find
     # a path.
 
-    # Get columns and rows.
-    columns = dct["cols"]
-    rows = dct["rows"]
- 
-    # Set obstacles.
-    obstacles_set = set(tuple(obs) for obs in dct["obstacles"])
+    if stats is None:
+        stats = SearchStats()
+    stats.start()
+
+    # Encode the maze (rows, columns and obstacles) as a flat grid.
+    grid = Grid.from_dict(dct, with_creeps=False)
 
     # Creeps can be ignored.
     
     # Set starting position.
-    start_pos = tuple(dct["start"])
+    start_cell = grid.cell(*dct["start"])
  
     # Set goals.
-    goals_set = set(tuple(goal) for goal in dct["goals"])
+    goals = grid.flags(dct["goals"])
 
     # Flashes can be ignored.
+    stats.mark("precompute")
 
     def run_bfs() -> List[int]:
         
         # Create a queue for BFS.
-        queue = deque([(start_pos, [])]) # position, path taken
+        queue = deque([start_cell])
 
         # Check if start already is goal.
-        if start_pos in goals_set:
+        if goals[start_cell]:
             return []
 
-        # Initialize visited set to track visited positions.
-        visited_pos = set()
+        # Every cell is queued once, so nothing popped is stale.
+        expanded, pushes, peak_frontier = 0, 1, 1
+
+        def report() -> None:
+            stats.expanded, stats.pops, stats.pushes, stats.peak_frontier = expanded, expanded, pushes, peak_frontier
+
+        # Initialize visited cells from the obstacles and border, so a single
+        # lookup checks for obstacles, boundaries and visited positions.
+        visited = bytearray(grid.blocked)
 
         # Mark the starting position as visited.
-        visited_pos.add(start_pos)
+        visited[start_cell] = 1
 
-        while queue:
-            cur_pos, path = queue.popleft()
+        # Track the action taken to reach each cell instead of copying the path
+        # taken into every queue entry. The parent cell is implied by the action.
+        actions = bytearray(grid.size)
 
-            for action_val, direction in enumerate(DIRECTIONS):
-                # Get directional changes.
-                row_change, col_change = direction
-                
-                # Get current x and y positions.
-                cur_row, cur_col = cur_pos
+        while queue:
+            if len(queue) > peak_frontier:
+                peak_frontier = len(queue)
+            cur_cell = queue.popleft()
+            expanded += 1
 
+            for action_val, offset in enumerate(grid.offsets):
                 # Calculate new position.
-                new_row, new_col = cur_row + row_change, cur_col + col_change
-                new_pos = (new_row, new_col)
+                new_cell = cur_cell + offset
 
                 # Check for obstacles and boundaries.
-                if (0 <= new_row < rows and 0 <= new_col < columns 
-                    and new_pos not in obstacles_set
-                    and new_pos not in visited_pos):
-                        new_path = path + [action_val]  
+                if not visited[new_cell]:
+                        actions[new_cell] = action_val
 
                         # Goal test when child node generated.
-                        if new_pos in goals_set:
-                             return new_path
-
-                        queue.append((new_pos, new_path))
-                        visited_pos.add(new_pos)
+                        if goals[new_cell]:
+                             report()
+                             return build_actions(new_cell, start_cell, actions, grid.offsets)
+
+                        queue.append(new_cell)
+                        pushes += 1
+                        visited[new_cell] = 1
+        report()
         return []
     
-    return run_bfs()
+    if bidirectional:
+        path = path_actions(bidirectional_search(grid, start_cell, goals, stats), grid.offsets)
+    else:
+        path = run_bfs()
+    stats.mark("search")
+    return path
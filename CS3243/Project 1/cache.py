@@ -0,0 +1,62 @@
+from typing import Any, Hashable
+from array import array
+from collections import OrderedDict
+
+class LRUCache:
+    # Mapping holding at most capacity entries, dropping the least recently used
+    # one to make room. A capacity of 0 stores nothing.
+    def __init__(self, capacity: int):
+        if capacity < 0:
+            raise ValueError(f"Cache capacity must be non-negative, got {capacity}")
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if not self.capacity:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+class TranspositionTable:
+    # Fixed-size table from non-negative int keys to 32-bit int values, each key stored
+    # in slot key % capacity and replacing whatever was there. A capacity of 0 stores
+    # nothing. Two flat arrays, 12 bytes a slot rather than the ~100 bytes an entry
+    # of LRUCache takes, for the iterative deepening searches.
+    def __init__(self, capacity: int):
+        if capacity < 0:
+            raise ValueError(f"Table capacity must be non-negative, got {capacity}")
+        self.capacity = capacity
+        self._keys = array("l", [-1]) * capacity
+        self._values = array("i", [0]) * capacity
+
+    def get(self, key: int, default: Any = None) -> Any:
+        if not self.capacity:
+            return default
+        slot = key % self.capacity
+        return self._values[slot] if self._keys[slot] == key else default
+
+    def __setitem__(self, key: int, value: int) -> None:
+        if self.capacity:
+            slot = key % self.capacity
+            self._keys[slot] = key
+            self._values[slot] = value
+
+    def clear(self) -> None:
+        self._keys = array("l", [-1]) * self.capacity
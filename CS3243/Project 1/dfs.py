@@ -1,90 +1,186 @@
 from typing import Dict, List, Tuple
-from collections import deque
-
-# Helper function to build the path from the goal to the start.
-# Helps to prevent updating the full path at every step, increasing efficiency for big mazes.
-def build_path(end_pos, parents):
-    path = []
-    while end_pos is not None:
-        path.append(end_pos)
-        end_pos = parents[end_pos]
-    return path[::-1]  # Reverse it to get path from start to end.
-
-def search(dct: Dict) -> List[Tuple[int, int]]:
+from array import array
+from cache import TranspositionTable
+from grid import Grid, build_path, new_parents, reaches_goal
+from stats import SearchStats
+
+def search(dct: Dict, iterative: bool = False, cache_size: int = 1 << 12, stats: SearchStats = None) -> List[Tuple[int, int]]:
     """
     Solve the maze using depth-first search.
 
+    With iterative set, runs iterative deepening DFS instead, which only keeps the
+    current path, a byte per cell and a table of cache_size slots in memory, and
+    returns a shortest path. The table remembers the shallowest depth cells were
+    reached at, to prune repeats, so larger ones trade memory for speed.
+    stats, if given, is filled with what the search did (see stats.SearchStats).
+
     Write your implementation below
     """
 
-    ### 1. Define the maze structure: ###
-    columns = dct["cols"]
-    rows = dct["rows"]
+    if stats is None:
+        stats = SearchStats()
+    stats.start()
 
-    # Set obstacles.
-    obstacles_set = set(tuple(obs) for obs in dct["obstacles"])
+    ### 1. Define the maze structure: ###
+    grid = Grid.from_dict(dct, with_creeps=False)
 
     # Set starting position.
-    start_pos = tuple(dct["start"])
+    start_cell = grid.cell(*dct["start"])
 
     # Set goals.
-    goals_set = set(tuple(goal) for goal in dct["goals"])
+    goals = grid.flags(dct["goals"])
+    stats.mark("precompute")
     
-    def run_dfs(start_pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+    def run_dfs(start_cell: int) -> List[Tuple[int, int]]:
         
         ### 3. Create a stack: ###
-        stack = deque([start_pos])
+        stack = [start_cell]
         
         # Check if start is already the goal.
-        if start_pos in goals_set:
-            return [start_pos]
+        if goals[start_cell]:
+            return [grid.pos(start_cell)]
         
-        # Initialize visited set to track visited positions.
-        visited_pos = set()
+        # Initialize visited cells from the obstacles and border.
+        visited = bytearray(grid.blocked)
 
         ### 4. Mark the starting position as visited: ###
-        visited_pos.add(start_pos)
+        visited[start_cell] = 1
 
-        # Create a parents dictionary to track the path.
-        parents = {start_pos: None}
+        # Create a parents table to track the path.
+        parents = new_parents(grid)
         
         # Possible next steps that can be taken (right, left, down, up).
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        up, down, left, right = grid.offsets
+        directions = [right, left, down, up]
+
+        # Every cell is pushed once, when it is reached.
+        pushes, pops, peak_frontier = 1, 0, 1
+
+        def report() -> None:
+            stats.expanded, stats.pushes, stats.pops, stats.peak_frontier = pushes, pushes, pops, peak_frontier
 
         while stack:
-            (cur_row, cur_col) = stack[-1]  # Peek into stack.
+            cur_cell = stack[-1]  # Peek into stack.
     
             found_next = False
             
             ### 5. Explore adjacent cells: ###
-            for row_change, column_change in directions:
-                new_row, new_col = cur_row + row_change, cur_col + column_change
-                new_pos = (new_row, new_col)
+            for offset in directions:
+                new_cell = cur_cell + offset
 
                 ### 6. Check for obstacles and boundaries: ###
-                if (0 <= new_row < rows and 0 <= new_col < columns 
-                    and new_pos not in obstacles_set
-                    and new_pos not in visited_pos):
-                        visited_pos.add(new_pos)
+                if not visited[new_cell]:
+                        visited[new_cell] = 1
 
                         ### 7. Track the path: ###   
                         # Update parent of the new position.
-                        parents[new_pos] = (cur_row, cur_col)
+                        parents[new_cell] = cur_cell
 
                         ### 10. Return the path: Early goal test. ###
-                        if new_pos in goals_set:
-                            return build_path(new_pos, parents)
+                        if goals[new_cell]:
+                            report()
+                            return grid.positions(build_path(new_cell, parents))
                         
                         ### 9. Backtrack if necessary: ###
                         # Next step found, add to stack and set flag to true to continue
                         # traversing recursively by not popping (backtracking).
-                        stack.append(new_pos)
+                        stack.append(new_cell)
+                        pushes += 1
+                        if len(stack) > peak_frontier:
+                            peak_frontier = len(stack)
                         found_next = True
                         break
                 
             if not found_next:
                 stack.pop()
+                pops += 1
 
+        report()
         return []
-    
-    return run_dfs(start_pos)
+
+    # Depth-limited DFS with the limit raised after each pass until a goal is found. Cells whose
+    # Manhattan distance to the nearest goal takes the path over the limit are cut off, and the
+    # next limit is the shortest path length that was cut off. Only the path, one byte per cell
+    # and the cache are kept, less than the parents table of run_dfs. Passes would only stop
+    # being cut off after exponentially many when no goal can be reached, so that is checked
+    # first, with a flood fill in the same bytes.
+    def run_iddfs(start_cell: int) -> List[Tuple[int, int]]:
+        if goals[start_cell]:
+            return [grid.pos(start_cell)]
+
+        # Cells on the current path with the next direction to try from them (2 plus
+        # the directions tried), and the obstacles and border (1).
+        on_path = bytearray(grid.blocked)
+        if not reaches_goal(grid, start_cell, goals, on_path):
+            return []
+        on_path[:] = grid.blocked
+
+        # Moves left to the nearest goal at best.
+        goal_positions = [(x, y) for x, y in dct["goals"] if grid.in_bounds(x, y)]
+
+        def manhattan(cell: int) -> int:
+            x, y = grid.pos(cell)
+            return min(abs(x - goal_x) + abs(y - goal_y) for goal_x, goal_y in goal_positions)
+
+        # Shallowest depth each recently seen cell was reached at in this pass, in at
+        # most one slot per two cells, keeping it smaller than the parents of run_dfs.
+        cache = TranspositionTable(min(cache_size, grid.size // 2))
+
+        up, down, left, right = grid.offsets
+        directions = [right, left, down, up]
+
+        # No goal is closer than its Manhattan distance, so start the limits there.
+        limit = manhattan(start_cell)
+
+        # The path is the frontier, each pass starting over from the start.
+        pushes, pops, peak_frontier, passes = 0, 0, 0, 0
+
+        def report() -> None:
+            stats.expanded, stats.pushes, stats.pops = pushes, pushes, pops
+            stats.peak_frontier, stats.passes = peak_frontier, passes
+
+        while True:
+            passes += 1
+            pushes += 1
+            cache.clear()
+            next_limit = None
+            path = array("l", [start_cell])
+            on_path[start_cell] = 2
+            while path:
+                cur_cell = path[-1]
+                depth = len(path)
+                tried = on_path[cur_cell] - 2
+                if tried == len(directions):
+                    # Every direction tried, backtrack.
+                    path.pop()
+                    pops += 1
+                    on_path[cur_cell] = 0
+                    continue
+                on_path[cur_cell] += 1
+                new_cell = cur_cell + directions[tried]
+                if on_path[new_cell] or cache.get(new_cell, limit + 1) <= depth:
+                    continue
+                if goals[new_cell]:
+                    path.append(new_cell)
+                    report()
+                    return grid.positions(path)
+                length = depth + manhattan(new_cell)
+                if length > limit:
+                    next_limit = length if next_limit is None else min(next_limit, length)
+                    continue
+                cache[new_cell] = depth
+                on_path[new_cell] = 2
+                path.append(new_cell)
+                pushes += 1
+                peak_frontier = max(peak_frontier, len(path))
+            if next_limit is None:
+                report()
+                return []
+            limit = next_limit
+
+    if iterative:
+        path = run_iddfs(start_cell)
+    else:
+        path = run_dfs(start_cell)
+    stats.mark("search")
+    return path
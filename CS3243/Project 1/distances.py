@@ -0,0 +1,143 @@
+from typing import List, Tuple
+from array import array
+from collections import deque
+from heapq import heappop, heappush
+from grid import Grid
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python passes give the same result.
+    np = None
+
+# Per-cell distance fields to the nearest goal, as flat arrays indexed by cell id.
+# Cells that cannot reach any goal (or every cell, if there are no goals) get
+# unreachable(grid), which is larger than any real distance.
+
+def unreachable(grid: Grid) -> int:
+    return grid.rows * grid.cols + 1
+
+# Manhattan distance from every cell to its nearest goal, ignoring obstacles.
+# Separable two-pass L1 distance transform: first the distance to the nearest goal
+# in the same row, then the nearest over all rows, each pass one forward and one
+# backward sweep. O(rows * cols) however many goals there are.
+def manhattan_field(grid: Grid, goals: List[Tuple[int, int]]) -> array:
+    rows, cols = grid.rows, grid.cols
+    far = unreachable(grid)
+    goals = [(x, y) for x, y in goals if grid.in_bounds(x, y)]
+    if np is not None:
+        return _manhattan_numpy(grid, goals, far)
+
+    distances = array("l", [far]) * grid.size
+    for x, row in enumerate(_manhattan_lists(rows, cols, goals, far)):
+        first = grid.cell(x, 0)
+        distances[first:first + cols] = array("l", row)
+    return distances
+
+def _manhattan_lists(rows: int, cols: int, goals: List[Tuple[int, int]], far: int) -> List[List[int]]:
+    # Distance to the nearest goal in the same row, only rows with goals need a sweep.
+    goal_cols = {}
+    for x, y in goals:
+        goal_cols.setdefault(x, []).append(y)
+    empty_row = [far] * cols
+    field = []
+    for x in range(rows):
+        if x not in goal_cols:
+            field.append(empty_row)
+            continue
+        row = [far] * cols
+        for y in goal_cols[x]:
+            row[y] = 0
+        for y in range(1, cols):
+            row[y] = min(row[y], row[y - 1] + 1)
+        for y in range(cols - 2, -1, -1):
+            row[y] = min(row[y], row[y + 1] + 1)
+        field.append(row)
+
+    # Nearest over all rows, sweeping down then up a whole row at a time.
+    for x in range(1, rows):
+        field[x] = [min(cur, prev + 1) for cur, prev in zip(field[x], field[x - 1])]
+    for x in range(rows - 2, -1, -1):
+        field[x] = [min(cur, prev + 1) for cur, prev in zip(field[x], field[x + 1])]
+    return field
+
+def _manhattan_numpy(grid: Grid, goals: List[Tuple[int, int]], far: int) -> array:
+    # Same passes as _manhattan_lists, vectorised across the other axis.
+    rows, cols = grid.rows, grid.cols
+    distances = array("l")
+    padded = np.full((rows + 2, grid.width), far, dtype=f"i{distances.itemsize}")
+    field = padded[1:-1, 1:-1]
+    if goals:
+        goal_x, goal_y = zip(*goals)
+        field[list(goal_x), list(goal_y)] = 0
+    for y in range(1, cols):
+        np.minimum(field[:, y], field[:, y - 1] + 1, out=field[:, y])
+    for y in range(cols - 2, -1, -1):
+        np.minimum(field[:, y], field[:, y + 1] + 1, out=field[:, y])
+    for x in range(1, rows):
+        np.minimum(field[x], field[x - 1] + 1, out=field[x])
+    for x in range(rows - 2, -1, -1):
+        np.minimum(field[x], field[x + 1] + 1, out=field[x])
+    distances.frombytes(padded.tobytes())
+    return distances
+
+# Shortest number of moves from every cell to its nearest goal around obstacles.
+# Multi-source BFS from all goals at once. Never smaller than the Manhattan
+# distance, so a stronger heuristic wherever obstacles force detours.
+def bfs_field(grid: Grid, goals: List[Tuple[int, int]]) -> array:
+    far = unreachable(grid)
+    distances = array("l", [far]) * grid.size
+    visited = bytearray(grid.blocked)
+    queue = deque()
+    for x, y in goals:
+        if grid.in_bounds(x, y):
+            cell = grid.cell(x, y)
+            if not visited[cell]:
+                visited[cell] = 1
+                distances[cell] = 0
+                queue.append(cell)
+
+    offsets = grid.offsets
+    while queue:
+        cur_cell = queue.popleft()
+        next_distance = distances[cur_cell] + 1
+        for offset in offsets:
+            new_cell = cur_cell + offset
+            if not visited[new_cell]:
+                visited[new_cell] = 1
+                distances[new_cell] = next_distance
+                queue.append(new_cell)
+    return distances
+
+# Largest cost any cell can have in creep_field, above any real cost.
+def unreachable_cost(grid: Grid) -> int:
+    return unreachable(grid) * (4 + max(grid.damage, default=0))
+
+# Cheapest cost from every cell to its nearest goal in the A* model without flash
+# or inversion, where each move costs 4 plus the creeps of the cell entered.
+# Multi-source Dijkstra from all goals at once, stepping backwards: leaving a cell
+# for its neighbour costs what entering the cell did.
+def creep_field(grid: Grid, goals: List[Tuple[int, int]]) -> array:
+    far = unreachable_cost(grid)
+    distances = array("q", [far]) * grid.size
+    visited = bytearray(grid.blocked)
+    pq = []
+    for x, y in goals:
+        if grid.in_bounds(x, y):
+            cell = grid.cell(x, y)
+            if not visited[cell] and distances[cell]:
+                distances[cell] = 0
+                heappush(pq, (0, cell))
+
+    damage, offsets = grid.damage, grid.offsets
+    while pq:
+        cost, cur_cell = heappop(pq)
+        if visited[cur_cell]:
+            continue
+        visited[cur_cell] = 1
+        new_cost = cost + 4 + damage[cur_cell]
+        for offset in offsets:
+            new_cell = cur_cell + offset
+            if not visited[new_cell] and new_cost < distances[new_cell]:
+                distances[new_cell] = new_cost
+                heappush(pq, (new_cost, new_cell))
+    return distances
@@ -0,0 +1,109 @@
+from typing import Dict, Hashable, List, Tuple
+from array import array
+from hashlib import blake2b
+from cache import LRUCache
+from distances import bfs_field, creep_field, unreachable, unreachable_cost
+from grid import Grid
+
+# Answers repeated searches on the same maze and goals from one distance field.
+# The first query on a maze runs a reverse multi-source search from the goals,
+# later ones, with any start, just walk down the field from the start, taking
+# time proportional to the path length.
+#
+# Models:
+#   "bfs"    fewest moves, the same actions as bfs.search
+#   "creep"  cheapest path in the A* model without flash or inversion, each move
+#            costing 4 plus the creeps entered, as astar.search actions
+#
+# Fields are kept for the capacity most recently used (maze, goals, model) keys.
+# Mazes are identified by a fingerprint of their contents, taken once per grid or
+# obstacles and creeps lists, so those must not be changed in place after a query,
+# or by a key the caller passes instead.
+
+# Distance field, whether creeps matter, and the sentinel for cells with no path.
+MODELS = {
+    "bfs": (bfs_field, False, unreachable),
+    "creep": (creep_field, True, unreachable_cost),
+}
+
+# Fingerprint of a maze, with its creeps or not.
+def fingerprint(dct: Dict, with_creeps: bool) -> bytes:
+    digest = blake2b(digest_size=16)
+    digest.update(repr((with_creeps, dct.get("rows"), dct.get("cols"))).encode())
+    grid = dct.get("grid")
+    if grid is not None:
+        digest.update(repr((grid.rows, grid.cols)).encode())
+        digest.update(grid.blocked)
+        if with_creeps:
+            digest.update(grid.damage)
+    else:
+        digest.update(repr(dct["obstacles"]).encode())
+        if with_creeps:
+            digest.update(repr(dct.get("creeps", [])).encode())
+    return digest.digest()
+
+class GoalDistanceCache:
+    # LRU cache of goal distance fields, see above.
+    def __init__(self, capacity: int = 8):
+        self.fields = LRUCache(capacity)
+        # Fingerprints by the identity of the maze objects, which are held on to so
+        # their ids are not reused.
+        self.fingerprints = LRUCache(capacity)
+        self.hits = 0
+        self.misses = 0
+
+    def maze_key(self, dct: Dict, with_creeps: bool) -> bytes:
+        # Fingerprint of the maze of dct, only taken the first time its objects are seen.
+        grid = dct.get("grid")
+        objects = (grid,) if grid is not None else (dct["obstacles"], dct.get("creeps") if with_creeps else None)
+        identity = (tuple(map(id, objects)), dct.get("rows"), dct.get("cols"), with_creeps)
+        entry = self.fingerprints.get(identity)
+        if entry is None:
+            entry = (objects, fingerprint(dct, with_creeps))
+            self.fingerprints[identity] = entry
+        return entry[1]
+
+    def field(self, dct: Dict, model: str = "bfs", maze_key: Hashable = None) -> Tuple[Grid, array]:
+        # The grid and its distance field for the maze and goals of dct, from the
+        # cache when possible. maze_key, if given, identifies the maze instead of its
+        # fingerprint, and must differ between mazes.
+        if model not in MODELS:
+            raise ValueError(f"Unknown model {model!r}, expected one of {sorted(MODELS)}")
+        make_field, with_creeps, _ = MODELS[model]
+        if maze_key is None:
+            maze_key = self.maze_key(dct, with_creeps)
+        key = (model, maze_key, tuple(sorted(tuple(goal) for goal in dct["goals"])))
+        entry = self.fields.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        grid = Grid.from_dict(dct, with_creeps=with_creeps)
+        entry = (grid, make_field(grid, [tuple(goal) for goal in dct["goals"]]))
+        self.fields[key] = entry
+        return entry
+
+    def search(self, dct: Dict, model: str = "bfs", maze_key: Hashable = None) -> List[int]:
+        """
+        Returns the actions of a shortest ("bfs") or cheapest ("creep") path from
+        dct["start"] to the nearest goal, or [] if the start is a goal or no goal
+        can be reached. maze_key, if given, identifies the maze (see field).
+        """
+        grid, distances = self.field(dct, model, maze_key)
+        far = MODELS[model][2](grid)
+        cur_cell = grid.cell(*dct["start"])
+        if distances[cur_cell] >= far:
+            return []
+
+        # Step to a neighbour whose distance accounts for the rest of the path.
+        damage = grid.damage if model == "creep" else None
+        path = []
+        while distances[cur_cell]:
+            for action_val, offset in enumerate(grid.offsets):
+                new_cell = cur_cell + offset
+                step = 1 if damage is None else 4 + damage[new_cell]
+                if not grid.blocked[new_cell] and distances[new_cell] + step == distances[cur_cell]:
+                    break
+            path.append(action_val)
+            cur_cell = new_cell
+        return path
@@ -0,0 +1,251 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+from array import array
+from stats import SearchStats
+
+# Row and column changes for each move, in Action order.
+DIRECTIONS = [
+    (-1, 0), # UP
+    (1, 0),  # DOWN
+    (0, -1), # LEFT
+    (0, 1)  # RIGHT
+]
+
+class Grid:
+    # Maze encoded once as flat arrays indexed by cell id = (row + 1) * width + (col + 1).
+    # The maze is padded with a sentinel border of blocked cells, so neighbour lookups
+    # never need a bounds check: stepping off the maze always lands on a blocked cell.
+    def __init__(self, rows: int, cols: int, blocked=None, damage=None):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.size = (rows + 2) * self.width
+
+        # 1 for obstacles and the sentinel border, 0 for free cells.
+        # Any byte buffer, e.g. a read-only view of a memory-mapped maze file.
+        self.blocked = blocked if blocked is not None else self._create_blocked()
+
+        # Creep damage per cell, 0 where there are no creeps, as ints indexed by cell.
+        # None for searches that ignore creeps.
+        self.damage = damage
+
+        # Cell id offsets for each move, in DIRECTIONS order.
+        self.offsets = [row_change * self.width + col_change for row_change, col_change in DIRECTIONS]
+
+        # Flash jump table, built on first use.
+        self._landings = None
+
+    def _create_blocked(self) -> bytearray:
+        # Creates the occupancy map with only the sentinel border blocked.
+        blocked = bytearray(self.size)
+        last_row = (self.rows + 1) * self.width
+        blocked[0:self.width] = b"\x01" * self.width
+        blocked[last_row:last_row + self.width] = b"\x01" * self.width
+        blocked[0::self.width] = b"\x01" * (self.rows + 2)
+        blocked[self.width - 1::self.width] = b"\x01" * (self.rows + 2)
+        return blocked
+
+    @classmethod
+    def from_dict(cls, dct: Dict, with_creeps: bool = True) -> Grid:
+        # Builds the grid from the usual search input dictionary, or reuses the
+        # prebuilt grid under dct["grid"] if it has what the search needs.
+        grid = dct.get("grid")
+        if grid is not None and (grid.damage is not None or not with_creeps):
+            return grid
+
+        grid = cls(dct["rows"], dct["cols"])
+        for row, col in dct["obstacles"]:
+            if grid.in_bounds(row, col):
+                grid.blocked[grid.cell(row, col)] = 1
+
+        # Searches that ignore creeps skip building the damage map.
+        if with_creeps:
+            grid.damage = array("i", [0]) * grid.size
+
+            # Later creeps at the same position replace earlier ones.
+            for row, col, num in dct.get("creeps", ()):
+                if grid.in_bounds(row, col):
+                    grid.damage[grid.cell(row, col)] = num
+        return grid
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def cell(self, row: int, col: int) -> int:
+        # Converts a (row, col) position into a cell id.
+        return (row + 1) * self.width + col + 1
+
+    def pos(self, cell: int) -> Tuple[int, int]:
+        # Converts a cell id back into a (row, col) position.
+        row, col = divmod(cell, self.width)
+        return (row - 1, col - 1)
+
+    def cells(self) -> Iterable[int]:
+        # Iterates over the ids of every cell inside the maze, free or not.
+        for row in range(1, self.rows + 1):
+            yield from range(row * self.width + 1, row * self.width + self.cols + 1)
+
+    def flags(self, positions: Iterable[Tuple[int, int]]) -> bytearray:
+        # Marks the given positions (e.g. goals) in a flat array, ignoring any out of bounds.
+        marked = bytearray(self.size)
+        for row, col in positions:
+            if self.in_bounds(row, col):
+                marked[self.cell(row, col)] = 1
+        return marked
+
+    def positions(self, cells: Iterable[int]) -> List[Tuple[int, int]]:
+        return [self.pos(cell) for cell in cells]
+
+    def flash_landings(self) -> List[array]:
+        # Jump table of the cell reached by moving in each direction until the next
+        # obstacle or the border, one array per direction in DIRECTIONS order.
+        # The number of steps taken is (landing - cell) // offset.
+        # Built once per grid from runs of free cells along every row and column.
+        if self._landings is None:
+            self._landings = [array("i", [0]) * self.size for _ in DIRECTIONS]
+            self._fill_landings(range(self.rows), range(self.cols))
+        return self._landings
+
+    def refresh_landings(self, rows: Iterable[int], cols: Iterable[int]) -> None:
+        # Refills the jump table along the given rows and columns after obstacles on them change.
+        if self._landings is not None:
+            self._fill_landings(rows, cols)
+
+    def _fill_landings(self, rows: Iterable[int], cols: Iterable[int]) -> None:
+        up, down, left, right = self._landings
+        lines = [((row + 1) * self.width, 1, self.width, left, right) for row in rows]
+        lines += [(col + 1, self.width, self.rows + 2, up, down) for col in cols]
+        for first, stride, length, backward, forward in lines:
+            line = bytes(self.blocked[first:first + stride * length:stride])
+            end = 0
+            while True:
+                begin = line.find(0, end)
+                if begin == -1:
+                    break
+                end = line.find(1, begin)
+                run = slice(first + stride * begin, first + stride * end, stride)
+                backward[run] = array("i", [first + stride * begin]) * (end - begin)
+                forward[run] = array("i", [first + stride * (end - 1)]) * (end - begin)
+
+# Helper function to build the path from the goal to the start.
+# Helps to prevent updating the full path at every step, increasing efficiency for big mazes.
+def build_path(end_cell: int, parents: array) -> List[int]:
+    path = []
+    while end_cell != -1:
+        path.append(end_cell)
+        end_cell = parents[end_cell]
+    return path[::-1]  # Reverse it to get path from start to end.
+
+# Helper function to build the list of actions taken from the start to the goal,
+# stepping back from each cell by the offset of the action that reached it.
+def build_actions(end_cell: int, start_cell: int, actions: bytearray, offsets: List[int]) -> List[int]:
+    path = []
+    while end_cell != start_cell:
+        action_val = actions[end_cell]
+        path.append(action_val)
+        end_cell -= offsets[action_val]
+    return path[::-1]
+
+# Creates a parent table with no parents set.
+def new_parents(grid: Grid) -> array:
+    return array("l", [-1]) * grid.size
+
+# Lists the cells set in a flat array of flags, scanning at C speed.
+def marked_cells(marked: bytearray) -> List[int]:
+    cells = []
+    cell = marked.find(1)
+    while cell != -1:
+        cells.append(cell)
+        cell = marked.find(1, cell + 1)
+    return cells
+
+# Flood fill from the start, returning whether it reaches a goal. marks starts as a
+# copy of the blocked cells and is left dirty. Each cell reached keeps the direction
+# it was entered from and the next one to try in its byte of marks, which is all the
+# fill needs to backtrack, so it takes no memory beyond marks for the memory-bounded
+# searches.
+def reaches_goal(grid: Grid, start_cell: int, goals: bytearray, marks: bytearray) -> bool:
+    offsets = grid.offsets
+    cur_cell = start_cell
+    marks[cur_cell] = 2  # Entered from no direction, none tried yet.
+    while not goals[cur_cell]:
+        entered, tried = divmod(marks[cur_cell] - 2, 5)
+        if tried < len(offsets):
+            marks[cur_cell] += 1
+            new_cell = cur_cell + offsets[tried]
+            if not marks[new_cell]:
+                marks[new_cell] = 2 + (tried + 1) * 5
+                cur_cell = new_cell
+        elif entered:
+            cur_cell -= offsets[entered - 1]
+        else:
+            return False
+    return True
+
+# Converts a path of adjacent cells into the actions moving along it.
+def path_actions(path: List[int], offsets: List[int]) -> List[int]:
+    return [offsets.index(next_cell - cell) for cell, next_cell in zip(path, path[1:])]
+
+# Bidirectional breadth-first search on unit-cost moves, returning the cells of a
+# shortest path from the start to any goal, or [] if no goal can be reached.
+# One frontier grows from the start and one from all goals at once, expanding the
+# smaller frontier by a full layer each round. Moves are reversible, so the first
+# cell found by both searches lies on a shortest path.
+# Fills stats, if given, with the cells expanded and queued and the peak size of both frontiers.
+def bidirectional_search(grid: Grid, start_cell: int, goals: bytearray, stats: SearchStats = None) -> List[int]:
+    if goals[start_cell]:
+        return [start_cell]
+
+    # Initialize visited cells from the obstacles and border for both directions.
+    visited_fwd = bytearray(grid.blocked)
+    visited_bwd = bytearray(grid.blocked)
+    parents_fwd = new_parents(grid)
+    parents_bwd = new_parents(grid)
+
+    frontier_fwd = [start_cell]
+    visited_fwd[start_cell] = 1
+    frontier_bwd = [cell for cell in marked_cells(goals) if not grid.blocked[cell]]
+    for cell in frontier_bwd:
+        visited_bwd[cell] = 1
+
+    expanded, pushes, peak_frontier = 0, 1 + len(frontier_bwd), 1 + len(frontier_bwd)
+
+    def report() -> None:
+        if stats is not None:
+            stats.expanded, stats.pops, stats.pushes, stats.peak_frontier = expanded, expanded, pushes, peak_frontier
+
+    while frontier_fwd and frontier_bwd:
+        peak_frontier = max(peak_frontier, len(frontier_fwd) + len(frontier_bwd))
+        forward = len(frontier_fwd) <= len(frontier_bwd)
+        if forward:
+            frontier, visited, parents, other = frontier_fwd, visited_fwd, parents_fwd, visited_bwd
+        else:
+            frontier, visited, parents, other = frontier_bwd, visited_bwd, parents_bwd, visited_fwd
+
+        next_frontier = []
+        for cur_cell in frontier:
+            expanded += 1
+            for offset in grid.offsets:
+                new_cell = cur_cell + offset
+                if not visited[new_cell]:
+                    visited[new_cell] = 1
+                    parents[new_cell] = cur_cell
+
+                    # Both searches have reached this cell, join the two halves.
+                    if other[new_cell]:
+                        path = build_path(new_cell, parents_fwd)
+                        new_cell = parents_bwd[new_cell]
+                        while new_cell != -1:
+                            path.append(new_cell)
+                            new_cell = parents_bwd[new_cell]
+                        report()
+                        return path
+                    next_frontier.append(new_cell)
+                    pushes += 1
+
+        if forward:
+            frontier_fwd = next_frontier
+        else:
+            frontier_bwd = next_frontier
+    report()
+    return []
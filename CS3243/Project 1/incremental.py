@@ -0,0 +1,269 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+from heapq import heappop, heappush
+from collections import Counter
+from array import array
+from grid import Grid
+from distances import manhattan_field
+
+# Action values, as in astar.Action.
+FLASH = 4
+INVERSION = 5
+
+INF = float("inf")
+
+# Virtual goal state, reached at no cost from every state on a goal cell.
+GOAL = (-1, 0, False)
+
+State = Tuple[int, int, bool]  # cell, number of flashes left, is_inverted
+
+class IncrementalPlanner:
+    # Lifelong Planning A* (LPA*) over the astar.py state model: moves cost 4 plus the
+    # creep damage entered, flashes 2 per step plus 10 plus the damage landed on, and
+    # the one-off inversion swaps every free cell's damage for max creeps minus it.
+    #
+    # g and rhs (one-step lookahead) costs are kept between plans. update_cells()
+    # changes the maze and re-queues only the states whose incoming edges changed,
+    # so the next plan() repairs the previous search instead of starting over.
+    # A change of the maximum creep count on free cells changes every inverted
+    # cost, so that case (and only that one) replans from scratch.
+    #
+    # The heuristic is twice the Manhattan distance to the nearest goal: every edge
+    # costs at least 2 per cell moved, so it stays consistent whatever changes.
+    def __init__(self, dct: Dict):
+        grid = Grid.from_dict(dct)
+
+        # Private copy of the maze, updates write into it.
+        self.grid = Grid(grid.rows, grid.cols, bytearray(grid.blocked), array("i", grid.damage))
+        self.max_flash = dct["num_flash_left"]
+        self.start = (self.grid.cell(*dct["start"]), self.max_flash, False)
+        self.goals = self.grid.flags(dct["goals"])
+        self.goal_cells = [self.grid.cell(x, y) for x, y in dct["goals"] if self.grid.in_bounds(x, y)]
+        self.distances = manhattan_field(self.grid, [tuple(goal) for goal in dct["goals"]])
+        self.landings = self.grid.flash_landings()
+
+        # Number of free cells with each creep count, to keep max creeps up to date.
+        blocked, damage = self.grid.blocked, self.grid.damage
+        self.damage_counts = Counter(damage[cell] for cell in self.grid.cells() if not blocked[cell])
+        self.max_creeps = self._max_creeps()
+        self._reset()
+
+    def _max_creeps(self) -> int:
+        return max((num for num, count in self.damage_counts.items() if count > 0), default=0)
+
+    def _reset(self) -> None:
+        # Forgets all search effort, the next plan() starts from scratch.
+        self.g: Dict[State, float] = {}
+        self.rhs: Dict[State, float] = {self.start: 0}
+        self.open: List[Tuple[float, float, State]] = []
+        self.open_keys: Dict[State, Tuple[float, float]] = {}
+        self._queue(self.start)
+
+    #=== Maze model: ===#
+
+    def _damage(self, cell: int, is_inverted: bool) -> int:
+        # Inverted damage is worked out on demand rather than stored.
+        if is_inverted:
+            return self.max_creeps - self.grid.damage[cell]
+        return self.grid.damage[cell]
+
+    def _successors(self, state: State) -> Iterator[Tuple[State, int]]:
+        if state == GOAL:
+            return
+        cell, flashes, is_inverted = state
+        grid = self.grid
+        if grid.blocked[cell]:
+            return
+        if self.goals[cell]:
+            yield GOAL, 0
+        for action_val, offset in enumerate(grid.offsets):
+            new_cell = cell + offset
+            if not grid.blocked[new_cell]:
+                yield (new_cell, flashes, is_inverted), 4 + self._damage(new_cell, is_inverted)
+            if flashes > 0:
+                flash_cell = self.landings[action_val][cell]
+                steps = (flash_cell - cell) // offset
+                yield (flash_cell, flashes - 1, is_inverted), 2 * steps + 10 + self._damage(flash_cell, is_inverted)
+        if not is_inverted:
+            yield (cell, flashes, True), 0
+
+    def _predecessors(self, state: State) -> Iterator[Tuple[State, int, List[int]]]:
+        # Yields (previous state, edge cost, actions taken) for every edge into state.
+        if state == GOAL:
+            for cell in self.goal_cells:
+                if self.grid.blocked[cell]:
+                    continue
+                for flashes in range(self.max_flash + 1):
+                    for is_inverted in (False, True):
+                        yield (cell, flashes, is_inverted), 0, []
+            return
+        cell, flashes, is_inverted = state
+        grid = self.grid
+        if grid.blocked[cell]:
+            return
+        damage = self._damage(cell, is_inverted)
+        for action_val, offset in enumerate(grid.offsets):
+            prev_cell = cell - offset
+            if not grid.blocked[prev_cell]:
+                yield (prev_cell, flashes, is_inverted), 4 + damage, [action_val]
+
+            # Flashes in this direction land here from every cell behind, up to the
+            # previous obstacle, when the next cell ahead is blocked.
+            if flashes < self.max_flash and grid.blocked[cell + offset]:
+                prev_cell, steps = cell, 0
+                while not grid.blocked[prev_cell]:
+                    yield (prev_cell, flashes + 1, is_inverted), 2 * steps + 10 + damage, [FLASH, action_val]
+                    prev_cell -= offset
+                    steps += 1
+        if is_inverted:
+            yield (cell, flashes, False), 0, [INVERSION]
+
+    #=== LPA*: ===#
+
+    def _key(self, state: State) -> Tuple[float, float]:
+        cost = min(self.g.get(state, INF), self.rhs.get(state, INF))
+        heuristic = 0 if state == GOAL else 2 * self.distances[state[0]]
+        return (cost + heuristic, cost)
+
+    def _queue(self, state: State) -> None:
+        key = self._key(state)
+        self.open_keys[state] = key
+        heappush(self.open, (*key, state))
+
+    def _top_key(self) -> Tuple[float, float]:
+        # Drops entries superseded by a later push or removal.
+        while self.open:
+            k1, k2, state = self.open[0]
+            if self.open_keys.get(state) == (k1, k2):
+                return (k1, k2)
+            heappop(self.open)
+        return (INF, INF)
+
+    def _update_state(self, state: State) -> None:
+        # Recomputes rhs from every predecessor and fixes up the open list.
+        if state != self.start:
+            self.rhs[state] = min((self.g.get(prev, INF) + cost for prev, cost, _ in self._predecessors(state)), default=INF)
+        self._requeue(state)
+
+    def _requeue(self, state: State) -> None:
+        if self.g.get(state, INF) != self.rhs.get(state, INF):
+            self._queue(state)
+        else:
+            self.open_keys.pop(state, None)
+
+    def _compute_shortest_path(self) -> None:
+        # Unlike textbook LPA*, states tied with the goal's key are processed too, so
+        # every state the path is traced back through below is locally consistent.
+        g, rhs = self.g, self.rhs
+        while self.open_keys and (self._top_key() <= self._key(GOAL) or rhs.get(GOAL, INF) != g.get(GOAL, INF)):
+            _, _, state = heappop(self.open)
+            del self.open_keys[state]
+            if g.get(state, INF) > rhs.get(state, INF):
+                # Overconsistent, settle it and relax its successors.
+                g[state] = rhs[state]
+                for new_state, cost in self._successors(state):
+                    if new_state != self.start and g[state] + cost < rhs.get(new_state, INF):
+                        rhs[new_state] = g[state] + cost
+                        self._requeue(new_state)
+            else:
+                # Underconsistent, its cost went up: reset it and everything relying on it.
+                g[state] = INF
+                self._update_state(state)
+                for new_state, _ in self._successors(state):
+                    self._update_state(new_state)
+
+    def plan(self) -> List[int]:
+        """
+        Returns the cheapest list of actions from the start to any goal, in the same
+        format as astar.search, or [] if no goal can be reached.
+        """
+        if self.grid.blocked[self.start[0]]:
+            return []
+        self._compute_shortest_path()
+        if self.g.get(GOAL, INF) == INF:
+            return []
+
+        # Walk back from the goal along predecessors that account for its cost.
+        path = []
+        state = GOAL
+        while state != self.start:
+            prev, _, actions = min(self._predecessors(state), key=lambda edge: self.g.get(edge[0], INF) + edge[1])
+            path.extend(reversed(actions))
+            state = prev
+        return path[::-1]
+
+    def update_cells(self, obstacles: Iterable[Tuple[int, int]] = (), cleared: Iterable[Tuple[int, int]] = (),
+                     creeps: Iterable[Tuple[int, int, int]] = ()) -> None:
+        """
+        Applies a change to the maze: new obstacles, cleared obstacles and creep
+        counts (x, y, num) replacing the previous count at that position.
+        """
+        grid = self.grid
+        blocked, damage = grid.blocked, grid.damage
+        wanted = {}
+        for x, y in obstacles:
+            if grid.in_bounds(x, y):
+                wanted[grid.cell(x, y)] = 1
+        for x, y in cleared:
+            if grid.in_bounds(x, y):
+                wanted[grid.cell(x, y)] = 0
+        toggled = [cell for cell, state in wanted.items() if blocked[cell] != state]
+
+        # Flash landings can change along the rows and columns of toggled cells.
+        rows = {grid.pos(cell)[0] for cell in toggled}
+        cols = {grid.pos(cell)[1] for cell in toggled}
+        lines = self._line_cells(rows, cols)
+        old_landings = [[self.landings[action_val][cell] if not blocked[cell] else -1 for cell in line_cells]
+                        for action_val, line_cells in enumerate(lines)]
+
+        changed = set()
+        for cell in toggled:
+            if blocked[cell]:
+                blocked[cell] = 0
+                self.damage_counts[damage[cell]] += 1
+            else:
+                blocked[cell] = 1
+                self.damage_counts[damage[cell]] -= 1
+            changed.add(cell)
+            changed.update(cell + offset for offset in grid.offsets)
+        for x, y, num in creeps:
+            if grid.in_bounds(x, y):
+                cell = grid.cell(x, y)
+                if not blocked[cell]:
+                    self.damage_counts[damage[cell]] -= 1
+                    self.damage_counts[num] += 1
+                damage[cell] = num
+                changed.add(cell)
+        grid.refresh_landings(rows, cols)
+
+        # Edges from a cell whose flash landing moved now end somewhere else.
+        for action_val, line_cells in enumerate(lines):
+            for cell, old in zip(line_cells, old_landings[action_val]):
+                new = self.landings[action_val][cell] if not blocked[cell] else -1
+                if old != new:
+                    changed.update(landing for landing in (old, new) if landing != -1)
+
+        max_creeps = self._max_creeps()
+        if max_creeps != self.max_creeps:
+            self.max_creeps = max_creeps
+            self._reset()
+            return
+
+        for cell in changed:
+            if not 0 <= cell < grid.size:
+                continue
+            for flashes in range(self.max_flash + 1):
+                for is_inverted in (False, True):
+                    self._update_state((cell, flashes, is_inverted))
+
+        # Blocking or clearing a goal cell also removes or adds its edges to the virtual goal.
+        if any(self.goals[cell] for cell in toggled):
+            self._update_state(GOAL)
+
+    def _line_cells(self, rows: Iterable[int], cols: Iterable[int]) -> List[List[int]]:
+        # Cells whose landing in each direction (in DIRECTIONS order) may change when
+        # the given rows and columns change: up and down along the columns, left and
+        # right along the rows.
+        grid = self.grid
+        column_cells = [grid.cell(x, y) for y in cols for x in range(grid.rows)]
+        row_cells = [grid.cell(x, y) for x in rows for y in range(grid.cols)]
+        return [column_cells, column_cells, row_cells, row_cells]
@@ -0,0 +1,273 @@
+from typing import Any, BinaryIO, Dict, Iterator, List, Union
+from array import array
+import base64
+import json
+import re
+from grid import Grid
+
+# Streaming maze loader. Reads a maze JSON file in chunks and writes obstacles and
+# creeps straight into a Grid, instead of parsing them into millions of small lists
+# first. The result is the usual search input dictionary with the grid under "grid"
+# (see Grid.from_dict) in place of "obstacles" and "creeps".
+#
+# Besides the usual "obstacles": [[row, col], ...], obstacles can be given as
+#   "obstacle_runs": [[row, col, length], ...], runs of obstacles along a row, or
+#   "obstacle_bitmap": "<base64>", one bit per cell in row-major order, most
+#   significant bit first, 1 for an obstacle.
+# Any mix of the three is allowed, obstacles out of bounds are skipped as usual.
+#
+# Obstacles and creeps are written as they stream in once rows and cols have been
+# read, which is the case for files listing them first. Otherwise they are kept in
+# compact arrays until the end of the file.
+
+CHUNK_SIZE = 1 << 16
+
+NUMBER = re.compile(rb"-?\d+")
+CLOSE = re.compile(rb"\]\s*\]")
+WHITESPACE = b" \t\r\n"
+
+# Cells (bytes of 0 or 1) for each bitmap byte, most significant bit first.
+BITMAP_CELLS = [bytes((value >> bit) & 1 for bit in range(7, -1, -1)) for value in range(256)]
+
+class _JsonStream:
+    # Pull reader over the members of one top-level JSON object, reading the file in chunks.
+    def __init__(self, file: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buf = b""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self, size: int = None) -> bool:
+        # Reads the next chunk, dropping what has been consumed. False at the end of the file.
+        if self.eof:
+            return False
+        chunk = self.file.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> bytes:
+        # Next non-whitespace character, without consuming it, or b"" at the end of the file.
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos:self.pos + 1]
+            if not self._more():
+                return b""
+
+    def expect(self, char: bytes) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed maze file, expected {char.decode()!r} at byte {self.pos}")
+        self.pos += 1
+
+    def members(self) -> Iterator[str]:
+        # Yields each key of the top-level object, leaving the stream at its value.
+        self.expect(b"{")
+        if self.peek() == b"}":
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("Malformed maze file, object keys must be strings")
+            self.expect(b":")
+            yield key
+            if self.peek() == b"}":
+                return
+            self.expect(b",")
+
+    def value(self) -> Any:
+        # Parses the next (small) value whole, reading larger chunks while it is cut off.
+        self.peek()
+        decoder = json.JSONDecoder()
+        size = self.chunk_size
+        while True:
+            text = self.buf[self.pos:].decode("utf-8", "surrogateescape")
+            try:
+                value, end = decoder.raw_decode(text)
+            except json.JSONDecodeError:
+                if not self._more(size):
+                    raise ValueError("Malformed maze file, unexpected end of file") from None
+                size *= 2
+                continue
+            # A number running to the end of the buffer may continue in the next chunk.
+            if end < len(text) or not self._more(size):
+                self.pos += len(text[:end].encode("utf-8", "surrogateescape"))
+                return value
+
+    def ints(self) -> Iterator[array]:
+        # Streams the integers of the next value, an array of flat integer arrays
+        # such as the obstacles, in order, one array per chunk. Chunks are cut after
+        # a comma, so numbers are never split but records may be.
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self.pos += 1
+            return
+        while True:
+            data = self.buf[self.pos:]
+            match = CLOSE.search(data)
+            end = match.end() if match else data.rfind(b",") + 1
+            if end:
+                yield array("l", map(int, NUMBER.findall(data, 0, end)))
+                self.pos += end
+            if match:
+                return
+            if not self._more():
+                raise ValueError("Malformed maze file, unexpected end of file")
+
+    def string(self) -> Iterator[bytes]:
+        # Streams the contents of the next string value, which must have no escapes.
+        self.expect(b"\"")
+        while True:
+            end = self.buf.find(b"\"", self.pos)
+            if end != -1:
+                yield self.buf[self.pos:end]
+                self.pos = end + 1
+                return
+            yield self.buf[self.pos:]
+            self.pos = len(self.buf)
+            if not self._more():
+                raise ValueError("Malformed maze file, unexpected end of file")
+
+class _GridWriter:
+    # Writes streamed obstacles and creeps into the grid, or holds them until rows
+    # and cols are known.
+    def __init__(self):
+        self.grid = None
+        self.pending = []  # (writer method, values)
+
+    def create(self, rows: int, cols: int) -> None:
+        self.grid = Grid(rows, cols, damage=array("i", [0]) * ((rows + 2) * (cols + 2)))
+        for write, values in self.pending:
+            write(values)
+        self.pending = []
+
+    def write(self, write, values) -> None:
+        if self.grid is None:
+            self.pending.append((write, values))
+        else:
+            write(values)
+
+    def obstacles(self, values: array) -> None:
+        # Same as Grid.cell and Grid.in_bounds, inlined as this runs once per obstacle.
+        grid = self.grid
+        blocked, rows, cols, width = grid.blocked, grid.rows, grid.cols, grid.width
+        pairs = iter(values)
+        for row, col in zip(pairs, pairs):
+            if 0 <= row < rows and 0 <= col < cols:
+                blocked[(row + 1) * width + col + 1] = 1
+
+    def runs(self, values: array) -> None:
+        grid = self.grid
+        blocked = grid.blocked
+        triples = iter(values)
+        for row, col, length in zip(triples, triples, triples):
+            first, last = max(col, 0), min(col + length, grid.cols)
+            if 0 <= row < grid.rows and first < last:
+                cell = grid.cell(row, first)
+                blocked[cell:cell + last - first] = b"\x01" * (last - first)
+
+    def creeps(self, values: array) -> None:
+        # Later creeps at the same position replace earlier ones.
+        grid = self.grid
+        damage, rows, cols, width = grid.damage, grid.rows, grid.cols, grid.width
+        triples = iter(values)
+        for row, col, num in zip(triples, triples, triples):
+            if 0 <= row < rows and 0 <= col < cols:
+                damage[(row + 1) * width + col + 1] = num
+
+    def bitmap(self, data: bytes) -> None:
+        # Ors the bitmap's rows into the occupancy map, so other obstacles are kept.
+        grid = self.grid
+        cells = b"".join(BITMAP_CELLS[value] for value in data)
+        cols = grid.cols
+        if not cols:
+            return
+        for row in range(min(grid.rows, len(cells) // cols)):
+            first = grid.cell(row, 0)
+            line = int.from_bytes(grid.blocked[first:first + cols], "big") | int.from_bytes(cells[row * cols:(row + 1) * cols], "big")
+            grid.blocked[first:first + cols] = line.to_bytes(cols, "big")
+
+# Groups streamed integer arrays into whole records of the given size, carrying
+# any incomplete record over to the next array.
+def _records(chunks: Iterator[array], size: int) -> Iterator[array]:
+    carry = array("l")
+    for chunk in chunks:
+        values = carry + chunk
+        usable = len(values) - len(values) % size
+        carry = values[usable:]
+        yield values[:usable]
+
+def load_maze(file: Union[str, BinaryIO], chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Loads a maze JSON file, given as a path or a binary file object, into the usual
+    search input dictionary, with obstacles and creeps written straight into the
+    grid under "grid" rather than listed.
+    """
+    if isinstance(file, str):
+        with open(file, "rb") as handle:
+            return load_maze(handle, chunk_size)
+
+    stream = _JsonStream(file, chunk_size)
+    writer = _GridWriter()
+    dct = {}
+    bitmap = []
+    for key in stream.members():
+        if key == "obstacles":
+            for values in _records(stream.ints(), 2):
+                writer.write(writer.obstacles, values)
+        elif key == "obstacle_runs":
+            for values in _records(stream.ints(), 3):
+                writer.write(writer.runs, values)
+        elif key == "creeps":
+            for values in _records(stream.ints(), 3):
+                writer.write(writer.creeps, values)
+        elif key == "obstacle_bitmap":
+            # Base64 decodes in groups of 4 characters, the bitmap as a whole is
+            # written once complete, as rows can straddle chunks.
+            text = b""
+            for part in stream.string():
+                text += part
+                usable = len(text) - len(text) % 4
+                bitmap.append(base64.b64decode(text[:usable]))
+                text = text[usable:]
+            bitmap.append(base64.b64decode(text))
+        else:
+            dct[key] = stream.value()
+            if writer.grid is None and "rows" in dct and "cols" in dct:
+                writer.create(dct["rows"], dct["cols"])
+
+    if writer.grid is None:
+        raise ValueError("Maze file has no rows and cols")
+    if bitmap:
+        writer.bitmap(b"".join(bitmap))
+    dct["grid"] = writer.grid
+    return dct
+
+# Encodes the grid's obstacles as runs along each row, for "obstacle_runs".
+def obstacle_runs(grid: Grid) -> List[List[int]]:
+    runs = []
+    for row in range(grid.rows):
+        first = grid.cell(row, 0)
+        line = grid.blocked[first:first + grid.cols]
+        end = 0
+        while True:
+            begin = line.find(1, end)
+            if begin == -1:
+                break
+            end = line.find(0, begin)
+            if end == -1:
+                end = grid.cols
+            runs.append([row, begin, end - begin])
+    return runs
+
+# Encodes the grid's obstacles as a base64 bitmap, for "obstacle_bitmap".
+def obstacle_bitmap(grid: Grid) -> str:
+    cells = b"".join(grid.blocked[grid.cell(row, 0):grid.cell(row, 0) + grid.cols] for row in range(grid.rows))
+    cells += bytes(-len(cells) % 8)
+    bits = int(b"0" + cells.translate(bytes.maketrans(b"\x00\x01", b"01")), 2)
+    return base64.b64encode(bits.to_bytes(len(cells) // 8, "big")).decode()
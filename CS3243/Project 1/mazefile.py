@@ -0,0 +1,76 @@
+from typing import Dict, Union
+from array import array
+import mmap
+import struct
+import sys
+from grid import Grid
+
+# Binary maze files, memory-mapped so repeated solves skip parsing entirely.
+#
+# Layout, little-endian:
+#   header      magic b"MAZE", format version, rows and cols, as 4 bytes each
+#   occupancy   one byte per cell of the padded grid, Grid.blocked as is
+#   padding     up to a multiple of 4 bytes
+#   damage      one int32 per cell of the padded grid, Grid.damage as is
+#
+# open_maze() returns a grid whose occupancy map and damage array are read-only
+# views straight into the mapped file, so loading costs no time or memory up
+# front, and every process opening the same file shares one page cache copy.
+# Usage:
+#   grid = open_maze("maze.bin")
+#   astar.search({"grid": grid, "start": [0, 0], "goals": [[9, 9]], "num_flash_left": 2})
+
+MAGIC = b"MAZE"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+
+def _damage_offset(size: int) -> int:
+    return HEADER.size + (size + 3) // 4 * 4
+
+class MappedGrid(Grid):
+    # Grid backed by a memory-mapped maze file. Pickles as its path, so worker
+    # processes (see batch.py) map the same file instead of copying the maze.
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} maze file")
+        size = (rows + 2) * (cols + 2)
+        offset = _damage_offset(size)
+        if len(mapped) < offset + 4 * size:
+            raise ValueError(f"{path} is truncated")
+
+        view = memoryview(mapped)
+        damage = view[offset:offset + 4 * size].cast("i")
+        if sys.byteorder != "little":
+            # Native ints are big-endian here, so the damage array has to be copied.
+            damage = array("i", damage.tobytes())
+            damage.byteswap()
+        super().__init__(rows, cols, view[HEADER.size:HEADER.size + size], damage)
+        self.path = path
+
+    def __reduce__(self):
+        return (MappedGrid, (self.path,))
+
+def save_maze(maze: Union[Dict, Grid], path: str) -> None:
+    """
+    Writes a maze, given as the usual search input dictionary or a Grid, to a
+    binary maze file for open_maze.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_dict(maze)
+    damage = array("i", grid.damage) if grid.damage is not None else array("i", [0]) * grid.size
+    if sys.byteorder != "little":
+        damage.byteswap()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, grid.rows, grid.cols))
+        file.write(grid.blocked)
+        file.write(bytes(_damage_offset(grid.size) - HEADER.size - grid.size))
+        file.write(damage.tobytes())
+
+def open_maze(path: str) -> Grid:
+    """
+    Maps a binary maze file written by save_maze, returning its grid to pass to
+    any search under dct["grid"] along with the start, goals and flashes.
+    """
+    return MappedGrid(path)
@@ -0,0 +1,77 @@
+from typing import List, Tuple
+from functools import partial
+from heapq import heappop, heappush
+
+# Priority queues for the searches. Entries are tuples whose first element is an
+# integer priority; push(entry) adds one and pop() removes one with the lowest priority.
+
+class HeapQueue:
+    # Binary heap, O(log n) push and pop. Ties are broken by the rest of the entry.
+    def __init__(self):
+        self._heap = []
+        self.push = partial(heappush, self._heap)
+        self.pop = partial(heappop, self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+class BucketQueue:
+    # Dial's bucket queue for small non-negative integer edge costs.
+    # Buckets form a circular array covering priorities [cursor, cursor + span), so push
+    # is O(1) and pop scans forward at most C buckets past the last popped priority,
+    # where C is the largest gap between that priority and a pushed one. A push
+    # outside the window (larger costs, or a lower priority from an inconsistent
+    # heuristic) rebuilds the array, doubling the span until it covers the queue.
+    # Entries of equal priority pop last in, first out.
+    def __init__(self, span: int = 64):
+        self._span = span
+        self._buckets: List[List[Tuple]] = [[] for _ in range(span)]
+        self._cursor = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, entry: Tuple) -> None:
+        priority = entry[0]
+        if not self._size:
+            self._cursor = priority
+        if not self._cursor <= priority < self._cursor + self._span:
+            self._rebuild(priority)
+        self._buckets[priority % self._span].append(entry)
+        self._size += 1
+
+    def pop(self) -> Tuple:
+        if not self._size:
+            raise IndexError("pop from an empty bucket queue")
+        buckets, span, cursor = self._buckets, self._span, self._cursor
+        while not buckets[cursor % span]:
+            cursor += 1
+        self._cursor = cursor
+        self._size -= 1
+        return buckets[cursor % span].pop()
+
+    def _rebuild(self, priority: int) -> None:
+        # Moves and widens the window to cover every queued priority and the new one.
+        entries = [entry for bucket in self._buckets for entry in bucket]
+        low = min(priority, self._cursor)
+        high = max([priority] + [entry[0] for entry in entries])
+        span = self._span
+        while span <= high - low:
+            span *= 2
+        self._span = span
+        self._buckets = [[] for _ in range(span)]
+        self._cursor = low
+        for entry in entries:
+            self._buckets[entry[0] % span].append(entry)
+
+QUEUES = {
+    "heap": HeapQueue,
+    "bucket": BucketQueue,
+}
+
+# Creates an empty priority queue of the named kind.
+def new_queue(kind: str = "heap"):
+    if kind not in QUEUES:
+        raise ValueError(f"Unknown queue {kind!r}, expected one of {sorted(QUEUES)}")
+    return QUEUES[kind]()
@@ -0,0 +1,44 @@
+from typing import Dict
+from time import perf_counter
+
+class SearchStats:
+    # What a search did, filled in by the search() functions when passed as stats.
+    #   expanded         states whose successors were generated
+    #   pushes, pops     frontier insertions and removals, the start included
+    #   stale_pops       removals skipped, the state having been expanded already
+    #   peak_frontier    largest frontier (queue, stack or open list) size
+    #   precompute_time  seconds building the grid, distance fields, inversion and
+    #                    flash tables, search_time seconds searching
+    #   cost             path cost found by astar.search, None if no path
+    #   passes           passes of the iterative deepening searches
+    #   weight           weight of the last path yielded by astar.anytime_search
+    # Searches count in local variables and store the totals once they finish.
+    def __init__(self):
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_frontier = 0
+        self.precompute_time = 0.0
+        self.search_time = 0.0
+        self.cost = None
+        self.passes = 0
+        self.weight = None
+        self._clock = perf_counter()
+
+    def start(self) -> None:
+        # Starts timing, from the search() call.
+        self._clock = perf_counter()
+
+    def mark(self, phase: str) -> None:
+        # Adds the time since the last mark (or start) to the phase, "precompute" or "search".
+        now = perf_counter()
+        setattr(self, f"{phase}_time", getattr(self, f"{phase}_time") + now - self._clock)
+        self._clock = now
+
+    def as_dict(self) -> Dict:
+        return {key: value for key, value in vars(self).items() if not key.startswith("_")}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.as_dict().items())
+        return f"SearchStats({fields})"
@@ -1,84 +1,216 @@
 from typing import Dict, List, Tuple
-import heapq
+from grid import Grid, bidirectional_search, build_path, new_parents
+from pqueue import new_queue
+from stats import SearchStats
  
-# Helper function to build the path from the goal to the start.
-# Helps to prevent updating the full path at every step, increasing efficiency for big mazes.
-def build_path(end_pos, parents):
-    path = []
-    while end_pos is not None:
-        path.append(end_pos)
-        end_pos = parents[end_pos]
-    return path[::-1]  # Reverse it to get path from start to end.
- 
-def search(dct: Dict) -> List[Tuple[int, int]]:
+def search(dct: Dict, bidirectional: bool = False, queue: str = "heap", jump_point: bool = False,
+           stats: SearchStats = None) -> List[Tuple[int, int]]:
     """
     Solve the maze using uniform-cost search.
+
+    With bidirectional set, searches from the start and from all goals at once
+    and meets in the middle, returning a cheapest path in the same format.
+    queue selects the priority queue, "heap" or Dial's "bucket" queue.
+    With jump_point set, uses Jump Point Search, which only expands cells where
+    a cheapest path may turn and returns a cheapest path in the same format.
+    stats, if given, is filled with what the search did (see stats.SearchStats).
  
     Write your implementation below
     """
  
-    # Get columns and rows.
-    columns = dct["cols"]
-    rows = dct["rows"]
- 
-    # Set obstacles.
-    obstacles_set = set(tuple(obs) for obs in dct["obstacles"])
+    if stats is None:
+        stats = SearchStats()
+    stats.start()
+
+    # Encode the maze (rows, columns and obstacles) as a flat grid.
+    grid = Grid.from_dict(dct, with_creeps=False)
     
     # Set starting position.
-    start_pos = tuple(dct["start"])
+    start_cell = grid.cell(*dct["start"])
  
     # Set goals.
-    goals_set = set(tuple(goal) for goal in dct["goals"])
+    goals = grid.flags(dct["goals"])
+    stats.mark("precompute")
  
-    def run_ucs(start_pos: Tuple[int, int]) -> List[Tuple[int, int]]:
-        # Create a priority queue with its (cost, current position).
-        pq = [(0, start_pos)]
+    def run_ucs(start_cell: int) -> List[Tuple[int, int]]:
+        # Create a priority queue with its (cost, current cell).
+        pq = new_queue(queue)
+        pq.push((0, start_cell))
         
         # Check if start is already the goal.
-        if start_pos in goals_set:
-            return [start_pos]
+        if goals[start_cell]:
+            return [grid.pos(start_cell)]
 
-        # Initialize visited set to track visited positions.
-        visited_pos = set()
+        # Initialize visited cells from the obstacles and border.
+        visited = bytearray(grid.blocked)
 
-        # Create a parents dictionary to track the path.
-        parents = {start_pos: None}
+        # Create a parents table to track the path.
+        parents = new_parents(grid)
 
         # Possible next steps that can be taken (right, left, down, up).
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        up, down, left, right = grid.offsets
+        directions = [right, left, down, up]
+
+        expanded, pushes, pops, stale_pops, peak_frontier = 0, 1, 0, 0, 1
+
+        def report() -> None:
+            stats.expanded, stats.pushes, stats.pops = expanded, pushes, pops
+            stats.stale_pops, stats.peak_frontier = stale_pops, peak_frontier
         
         while pq:
-            # Using heapq, pops the smallest cost first.
-            # If all costs are the same, will pop as a normal queue.
-            cost, (cur_row, cur_col) = heapq.heappop(pq)
+            # Pops the smallest cost first.
+            cost, cur_cell = pq.pop()
+            pops += 1
  
             # Continue if position has already been visited.
-            if (cur_row, cur_col) in visited_pos:
+            if visited[cur_cell]:
+                stale_pops += 1
                 continue
             
             # Goal test when node is popped from pq.
-            if (cur_row, cur_col) in goals_set:
-                return build_path((cur_row, cur_col), parents)
+            if goals[cur_cell]:
+                report()
+                return grid.positions(build_path(cur_cell, parents))
             
-            visited_pos.add((cur_row, cur_col))
+            visited[cur_cell] = 1
+            expanded += 1
             
-            for row_change, column_change in directions:
-                new_row, new_col = cur_row + row_change, cur_col + column_change
-                new_pos = (new_row, new_col)
+            for offset in directions:
+                new_cell = cur_cell + offset
 
-                if (0 <= new_row < rows and 0 <= new_col < columns 
-                    and new_pos not in obstacles_set
-                    and new_pos not in visited_pos):
+                if not visited[new_cell]:
                         
                         # Add 1 to current cost.
                         new_cost = cost + 1
 
                         # Update parent of the new position.
-                        parents[new_pos] = (cur_row, cur_col)
+                        parents[new_cell] = cur_cell
+
+                        pq.push((new_cost, new_cell))
+                        pushes += 1
 
-                        heapq.heappush(pq, (new_cost, new_pos))
+            if len(pq) > peak_frontier:
+                peak_frontier = len(pq)
  
+        report()
         return []
     
-    return run_ucs(start_pos)
- 
\ No newline at end of file
+    def run_jps(start_cell: int) -> List[Tuple[int, int]]:
+        # Jump Point Search for 4-connected grids. Instead of pushing every neighbour,
+        # each expansion jumps in a straight line until a goal, a forced neighbour
+        # (a side cell that cannot be reached as cheaply from the cell behind) or,
+        # when moving vertically, a cell from which a horizontal jump finds one.
+        # Only those jump points enter the queue, with cost equal to the distance
+        # jumped, so the symmetric equal-cost paths of an open grid are skipped.
+        if goals[start_cell]:
+            return [grid.pos(start_cell)]
+
+        blocked = grid.blocked
+        up, down, left, right = grid.offsets
+
+        def jump_horizontal(cell: int, step: int) -> int:
+            # Returns the next jump point moving left or right from cell, -1 if none.
+            while not blocked[cell]:
+                if goals[cell]:
+                    return cell
+                if (not blocked[cell + up] and blocked[cell - step + up]) or (not blocked[cell + down] and blocked[cell - step + down]):
+                    return cell
+                cell += step
+            return -1
+
+        def jump_vertical(cell: int, step: int) -> int:
+            # Returns the next jump point moving up or down from cell, -1 if none.
+            while not blocked[cell]:
+                if goals[cell]:
+                    return cell
+                if (not blocked[cell + left] and blocked[cell - step + left]) or (not blocked[cell + right] and blocked[cell - step + right]):
+                    return cell
+                if jump_horizontal(cell + right, right) != -1 or jump_horizontal(cell + left, left) != -1:
+                    return cell
+                cell += step
+            return -1
+
+        pq = new_queue(queue)
+        pq.push((0, start_cell))
+        visited = bytearray(grid.size)
+        parents = new_parents(grid)
+        best_cost = {start_cell: 0}
+
+        # Directions to try from a jump point, by the direction it was reached from.
+        # Moving back the way it came is never needed.
+        successors = {
+            0: [right, left, down, up],
+            right: [right, down, up],
+            left: [left, down, up],
+            down: [down, left, right],
+            up: [up, left, right],
+        }
+
+        expanded, pushes, pops, stale_pops, peak_frontier = 0, 1, 0, 0, 1
+
+        def report() -> None:
+            stats.expanded, stats.pushes, stats.pops = expanded, pushes, pops
+            stats.stale_pops, stats.peak_frontier = stale_pops, peak_frontier
+
+        while pq:
+            cost, cur_cell = pq.pop()
+            pops += 1
+            if visited[cur_cell]:
+                stale_pops += 1
+                continue
+
+            # Goal test when node is popped from pq, filling in the straight runs
+            # between consecutive jump points.
+            if goals[cur_cell]:
+                jump_points = build_path(cur_cell, parents)
+                path = [start_cell]
+                for cell, next_cell in zip(jump_points, jump_points[1:]):
+                    step = next_cell - cell
+                    step = step // abs(step) if abs(step) < grid.width else (down if step > 0 else up)
+                    path.extend(range(cell + step, next_cell + step, step))
+                report()
+                return grid.positions(path)
+
+            visited[cur_cell] = 1
+            expanded += 1
+
+            parent = parents[cur_cell]
+            if parent == -1:
+                arrived = 0
+            elif abs(cur_cell - parent) < grid.width:
+                arrived = right if cur_cell > parent else left
+            else:
+                arrived = down if cur_cell > parent else up
+
+            for step in successors[arrived]:
+                if step in (left, right):
+                    jump_cell = jump_horizontal(cur_cell + step, step)
+                else:
+                    jump_cell = jump_vertical(cur_cell + step, step)
+                if jump_cell == -1 or visited[jump_cell]:
+                    continue
+
+                # Cost is the number of cells jumped over.
+                new_cost = cost + (jump_cell - cur_cell) // step
+                if new_cost < best_cost.get(jump_cell, new_cost + 1):
+                    best_cost[jump_cell] = new_cost
+                    parents[jump_cell] = cur_cell
+                    pq.push((new_cost, jump_cell))
+                    pushes += 1
+
+            if len(pq) > peak_frontier:
+                peak_frontier = len(pq)
+
+        report()
+        return []
+
+    if jump_point:
+        path = run_jps(start_cell)
+    elif bidirectional:
+        # Every move costs 1, so bidirectional uniform-cost search expands the same
+        # layers as bidirectional breadth-first search.
+        path = grid.positions(bidirectional_search(grid, start_cell, goals, stats))
+    else:
+        path = run_ucs(start_cell)
+    stats.mark("search")
+    return path
@@ -0,0 +1,110 @@
+# Compares csp.solve_CSP against exact_cover.solve_exact_cover on random boards,
+# both tilings where the squares fill every free cell and looser packings. Every
+# solution returned is checked to place all the squares without overlaps, and
+# each solve is stopped after a time limit, as some boards take either solver
+# minutes (see exact_cover.py). Even with its area, region and capacity cuts,
+# solve_CSP still times out on the tilings of sizes 22, 24 and 28, which
+# solve_exact_cover places in well under a second.
+#
+# Usage: python bench_exact_cover.py [--limit seconds] [size ...]
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from csp import solve_CSP
+from exact_cover import solve_exact_cover
+
+def tiling(size: int, max_square: int = 5, density: float = 0.05, large: float = 0.6, seed: int = 0) -> Dict:
+    # Random obstacles, then squares laid greedily over every free cell, so the
+    # squares are known to fill the board exactly. Each square is the largest that
+    # fits with probability large, else a random size that fits.
+    rng = random.Random(seed)
+    obstacles = [[x, y] for x in range(size) for y in range(size) if rng.random() < density]
+    covered = {(x, y) for x, y in obstacles}
+    squares = {}
+    for x in range(size):
+        for y in range(size):
+            if (x, y) in covered:
+                continue
+            fits = [s for s in range(1, max_square + 1)
+                    if x + s <= size and y + s <= size and not any((x + i, y + j) in covered for i in range(s) for j in range(s))]
+            s = fits[-1] if rng.random() < large else rng.choice(fits)
+            covered.update((x + i, y + j) for i in range(s) for j in range(s))
+            squares[s] = squares.get(s, 0) + 1
+    return {"rows": size, "cols": size, "obstacles": obstacles, "input_squares": squares}
+
+def packing(size: int, fill: float = 0.7, density: float = 0.03, seed: int = 0) -> Dict:
+    # Random obstacles and random squares adding up to the given share of the free area.
+    rng = random.Random(seed)
+    obstacles = [[x, y] for x in range(size) for y in range(size) if rng.random() < density]
+    squares, area = {}, 0
+    while True:
+        s = rng.choice([1, 1, 1, 2, 2, 3, 4])
+        if area + s * s > (size * size - len(obstacles)) * fill:
+            break
+        squares[s] = squares.get(s, 0) + 1
+        area += s * s
+    return {"rows": size, "cols": size, "obstacles": obstacles, "input_squares": squares}
+
+# Problems with a solution, as a list of (size, x, y), for the squares of dct. Tilings
+# are solvable, so no solution is a problem too.
+def check(dct: Dict, solution: List, solvable: bool) -> List[str]:
+    if not solution:
+        return ["no solution found"] if solvable else []
+    placed = {}
+    for size, x, y in solution:
+        placed[size] = placed.get(size, 0) + 1
+    if placed != dct["input_squares"]:
+        return [f"placed {placed}, expected {dct['input_squares']}"]
+    covered = {(x, y) for x, y in dct["obstacles"]}
+    for size, x, y in solution:
+        if x < 0 or y < 0 or x + size > dct["rows"] or y + size > dct["cols"]:
+            return [f"square of size {size} at {(x, y)} is off the board"]
+        cells = {(x + i, y + j) for i in range(size) for j in range(size)}
+        if cells & covered:
+            return [f"square of size {size} at {(x, y)} overlaps"]
+        covered |= cells
+    return []
+
+def timed(solve: Callable, dct: Dict) -> Tuple[List, float]:
+    start = time.perf_counter()
+    solution = solve(dct)
+    return solution, time.perf_counter() - start
+
+def run(solve: Callable, dct: Dict, limit: float) -> Tuple[Optional[List], float]:
+    # Solves in a separate process, returning None for the solution if it takes over limit seconds.
+    with multiprocessing.Pool(1) as pool:
+        try:
+            return pool.apply_async(timed, (solve, dct)).get(limit)
+        except multiprocessing.TimeoutError:
+            return None, limit
+
+def main(sizes: List[int], limit: float) -> int:
+    print(f"{'size':>6} {'board':>8} {'squares':>8} {'solver':>12} {'time (s)':>9} {'placed':>7} checks")
+    problems = False
+    for size in sizes:
+        for name, dct in (("tiling", tiling(size, seed=size)), ("packing", packing(size, seed=size))):
+            for solver_name, solve in (("backtracking", solve_CSP), ("dlx", solve_exact_cover)):
+                solution, elapsed = run(solve, dct, limit)
+                if solution is None:
+                    placed, status = "-", "timed out"
+                else:
+                    found = check(dct, solution, name == "tiling")
+                    placed, status = len(solution), "; ".join(found) or "ok"
+                    problems = problems or bool(found)
+                print(f"{size:>6} {name:>8} {sum(dct['input_squares'].values()):>8} {solver_name:>12} {elapsed:>9.3f} "
+                      f"{placed:>7} {status}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark solve_CSP against solve_exact_cover on generated boards.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[8, 12, 16, 20, 22, 24, 26, 28, 30])
+    parser.add_argument("--limit", type=float, default=60, help="seconds each solve may take")
+    args = parser.parse_args()
+    sys.exit(main(args.sizes, args.limit))
@@ -1,11 +1,28 @@
 from __future__ import annotations
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Callable
+
+# Boards and domains are bitsets held in Python ints. Bit row * width + col stands
+# for the cell (row, col) on the board, and for the placement with the square's
+# top-left corner there in a domain, so placements and the cells they cover can
+# be shifted into each other.
+
+def popcount(bits: int) -> int:
+    # Number of set bits, e.g. placements left in a domain.
+    return bin(bits).count("1")
+
+def iter_bits(bits: int):
+    # Yields the indices of the set bits, lowest first.
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
 
 class Square:
-    def __init__(self, size=0, coord: Tuple[int, int] = (0, 0)):
+    def __init__(self, size=0, coord: Tuple[int, int] = (0, 0), index: int = 0):
         self.size = size
         self.x = coord[0]
         self.y = coord[1]
+        self.index = index  # Position among the squares of the same size, which are placed in this order.
 
     def set_coordinates(self, x: int, y: int) -> None:
         # Sets the coordinates of the square.
@@ -21,95 +38,270 @@ class Board:
         self.width = cols
         self.height = rows
         self.obstacles = obstacles
-        self.matrix = self._create_matrix()
+        self.blocked = self._create_bitboard()  # Obstacle cells.
+        self.occupied = self.blocked  # Obstacle and placed square cells.
 
-    def _create_matrix(self) -> List[List[str]]:
-        # Creates a matrix to represent the board. Fills it with "0" and places "X" for obstacles.
-        matrix = [["0" for _ in range(self.width)] for _ in range(self.height)]
+    def _create_bitboard(self) -> int:
+        # Creates the bitboard of obstacle cells.
+        bits = 0
         for x, y in self.obstacles:
-            matrix[x][y] = "X"
-        return matrix
+            bits |= 1 << (x * self.width + y)
+        return bits
+
+    def rect(self, x: int, y: int, height: int, width: int) -> int:
+        # Bitset of the cells in the rectangle with top-left corner (x, y), clipped to the board.
+        top, left = max(x, 0), max(y, 0)
+        bottom, right = min(x + height, self.height), min(y + width, self.width)
+        if top >= bottom or left >= right:
+            return 0
+        row = ((1 << (right - left)) - 1) << left
+        bits = 0
+        for i in range(top, bottom):
+            bits |= row << (i * self.width)
+        return bits
+
+    def cover(self, size: int, x: int, y: int) -> int:
+        # Bitset of the cells covered by a square placed at (x, y).
+        return self.rect(x, y, size, size)
+
+    def covered(self, size: int, coords: int) -> int:
+        # Bitset of the cells covered by squares placed at any of the coordinates in the bitset.
+        # Coordinates come from domains, so the squares fit and shifts never wrap around a row.
+        row_cells = coords
+        for col in range(1, size):
+            row_cells |= coords << col
+        cells = row_cells
+        for row in range(1, size):
+            cells |= row_cells << (row * self.width)
+        return cells
 
-def initialize_domains(board: Board, input_squares: Dict[int, int]) -> Dict[Square, List[Tuple[int, int]]]:
-    # Initializes domains (list of coordinates to place squares) for each square type. 
+    def region(self, seed: int, free: int, limit: int) -> int:
+        # Bitset of the free cells connected to the seed cells, grown until no more are
+        # connected or it reaches limit cells.
+        width = self.width
+        not_first = sum(((1 << (width - 1)) - 1) << (row * width + 1) for row in range(self.height))
+        not_last = not_first >> 1
+        region = seed & free
+        while popcount(region) < limit:
+            grown = (region | (region << 1) & not_first | (region >> 1) & not_last | region << width | region >> width) & free
+            if grown == region:
+                break
+            region = grown
+        return region
+
+    def symmetries(self) -> List[Callable[[int, int, int], Tuple[int, int]]]:
+        # Flips and rotations of the board that map the obstacles onto themselves, as
+        # functions from a square's size and coordinates to those of its image.
+        rows, cols = self.height, self.width
+        candidates = [
+            lambda size, x, y: (rows - size - x, y),  # Flip top to bottom.
+            lambda size, x, y: (x, cols - size - y),  # Flip left to right.
+            lambda size, x, y: (rows - size - x, cols - size - y),  # Rotate by 180 degrees.
+        ]
+        if rows == cols:
+            candidates += [
+                lambda size, x, y: (y, x),  # Transpose.
+                lambda size, x, y: (cols - size - y, rows - size - x),  # Transpose along the other diagonal.
+                lambda size, x, y: (y, rows - size - x),  # Rotate by 90 degrees.
+                lambda size, x, y: (cols - size - y, x),  # Rotate by 270 degrees.
+            ]
+        obstacles = {tuple(obstacle) for obstacle in self.obstacles}
+        return [image for image in candidates if {image(1, x, y) for x, y in obstacles} == obstacles]
+
+def initialize_domains(board: Board, input_squares: Dict[int, int]) -> Dict[int, int]:
+    # Initializes domains (bitsets of coordinates to place squares) once per square size,
+    # shared by all the squares of that size.
     rows, cols = board.height, board.width
+
+    # Number of obstacles above and left of each cell, so any square's obstacles are counted in O(1).
+    counts = [[0] * (cols + 1) for _ in range(rows + 1)]
+    for x, y in board.obstacles:
+        counts[x + 1][y + 1] += 1
+    for row in range(rows):
+        for col in range(cols):
+            counts[row + 1][col + 1] += counts[row][col + 1] + counts[row + 1][col] - counts[row][col]
+
     domains = {}
     for size, count in input_squares.items():
-        for _ in range(count):
-            square = Square(size)
-            # List of all valid (x, y) coordinates where a square can be placed on the board without overlapping with any obstacles.
-            possible_locations = [(row, col) for row in range(rows - size + 1) for col in range(cols - size + 1) if not any("X" in board.matrix[row + k][col:col + size] for k in range(size))]
-            domains[square] = possible_locations
+        if not count:
+            continue
+        # Bitset of all valid (x, y) coordinates where a square can be placed on the board without overlapping with any obstacles.
+        possible_locations = 0
+        for row in range(rows - size + 1):
+            above, below = counts[row], counts[row + size]
+            for col in range(cols - size + 1):
+                if below[col + size] - above[col + size] - below[col] + above[col] == 0:
+                    possible_locations |= 1 << (row * cols + col)
+        domains[size] = possible_locations
     return domains
 
-def solve_CSP(dct: Dict[str, Any]) -> List[Square]:
+def solve_CSP(dct: Dict[str, Any], symmetry: bool = True, stats: Dict[str, int] = None) -> List[Square]:
+    # Squares of the same size are interchangeable, so each size has one domain and a
+    # count of squares left to place, and they are placed in order, each at coordinates
+    # after the previous one's, which skips the k! orderings of k equal squares. With
+    # symmetry set, if flips or rotations of the board keep its obstacles in place, only
+    # solutions whose first square of the largest size is at least as far up and left
+    # as any of the images of that size's squares are searched.
+    # Nodes are also cut when the squares left no longer fit in the free area, and stats,
+    # if given, is filled with the number of nodes and of cuts by each check.
     board = Board(dct["rows"], dct["cols"], dct["obstacles"])
     domains = initialize_domains(board, dct["input_squares"])
+    counts = {size: dct["input_squares"][size] for size in domains}  # Squares of each size left to place.
+    total = sum(counts.values())
+    all_cells = (1 << (board.height * board.width)) - 1
+    remaining_area = sum(size * size * count for size, count in counts.items())  # Area of the squares left.
+    if stats is None:
+        stats = {}
+    stats.update(nodes=0, area_cuts=0, region_cuts=0, capacity_cuts=0)
     assigned = []  # List of squares that have been assigned coordinates.
     undo_stack = []  # Stack to keep track of changes for backtracking.
 
+    # Lowest coordinates the squares of the pivot size are mapped to by the board's symmetries.
+    images = board.symmetries() if symmetry else []
+    pivot = max(domains, default=None) if images else None
+    lowest_image = {}
+    first_pivot_locations = -1  # Coordinates the first square of the pivot size can take.
+    if pivot is not None:
+        for coord in range(board.height * board.width):
+            x, y = divmod(coord, board.width)
+            if x + pivot <= board.height and y + pivot <= board.width:
+                lowest_image[coord] = min(row * board.width + col for row, col in (image(pivot, x, y) for image in images))
+        # The first square of the pivot size is not placed after any of its own images.
+        first_pivot_locations = sum(1 << coord for coord, low in lowest_image.items() if low >= coord)
+
     def is_consistent(square: Square, x: int, y: int) -> bool:
         # Checks if placing the square at coordinates (x, y) is consistent with the current board state.
-        size = square.size
-        return not any("1" in board.matrix[row][y:y + size] for row in range(x, x + size))
+        return not board.occupied & board.cover(square.size, x, y)
 
     def forward_checking(square: Square, x: int, y: int) -> bool:
-        # Updates the domains of other squares based on placing the given square at (x, y).
-        # Returns False if any domain becomes empty.
-        for s, coords in domains.items():
-            new_coords = [coord for coord in coords if not (coord[0] + s.size > x and coord[0] < x + square.size and coord[1] + s.size > y and coord[1] < y + square.size)]
-            if len(new_coords) < len(coords):
-                undo_stack.append((s, list(set(coords) - set(new_coords))))
-                domains[s] = new_coords
-            if not domains[s]:
+        # Updates the domains of the sizes left based on placing the given square at (x, y).
+        # A square of size s overlaps it when placed anywhere in the (size + s - 1) wide
+        # block of coordinates ending at (x, y) + size - 1, so that block is cleared.
+        # Returns False if the domain of a size with squares left becomes empty.
+        # Squares of the same size after this one go at later coordinates, and with the
+        # first square of the pivot size placed, no images of the others can come before it.
+        coord = x * board.width + y
+        conflicts = {square.size: board.rect(x - square.size + 1, y - square.size + 1, 2 * square.size - 1, 2 * square.size - 1) | ((2 << coord) - 1)}
+        if square.size == pivot and square.index == 0:
+            conflicts[pivot] |= sum(1 << other for other, low in lowest_image.items() if low < coord)
+        for size, coords in domains.items():
+            if not counts[size]:
+                continue
+            if size not in conflicts:
+                conflicts[size] = board.rect(x - size + 1, y - size + 1, square.size + size - 1, square.size + size - 1)
+            new_coords = coords & ~conflicts[size]
+            if new_coords != coords:
+                undo_stack.append((size, coords))
+                domains[size] = new_coords
+            if not new_coords:
                 return False
         return True
 
-    def run_csp() -> List[Square] or False:
-        # Recursive CSP backtracking algorithm.
-        if not domains:
-            return assigned
+    def is_feasible(square: Square, x: int, y: int) -> bool:
+        # Checks that the squares left can still fit after placing the given square at (x, y):
+        # their area is at most the free area, less free regions next to the square too small
+        # for the smallest of them, and each size has enough coordinates left, which together
+        # cover enough free cells.
+        free = all_cells & ~board.occupied
+        free_area = popcount(free)
+        if remaining_area > free_area:
+            stats["area_cuts"] += 1
+            return False
+
+        smallest = min(size for size in counts if counts[size]) ** 2
+        if smallest > 1:
+            # Only regions next to the square can have been cut off by it.
+            seeds = board.rect(x - 1, y - 1, square.size + 2, square.size + 2) & free
+            seen = wasted = 0
+            for seed in iter_bits(seeds):
+                if not seen >> seed & 1:
+                    region = board.region(1 << seed, free, smallest)
+                    seen |= region
+                    if popcount(region) < smallest:
+                        wasted += popcount(region)
+            if remaining_area > free_area - wasted:
+                stats["region_cuts"] += 1
+                return False
 
-        # Selects the next square to be assigned based on the Minimum Remaining Values heuristic.
-        square = min(domains.keys(), key=lambda x: len(domains[x]), default=None) 
-        if not square:
+        coverable = 0
+        for size, coords in domains.items():
+            if counts[size]:
+                if popcount(coords) < counts[size]:
+                    stats["capacity_cuts"] += 1
+                    return False
+                coverable |= board.covered(size, coords)
+        if remaining_area > popcount(coverable):
+            stats["capacity_cuts"] += 1
             return False
-        
-        for x, y in domains[square]:
-            # Check if can place square without violating constraint.
-            if is_consistent(square, x, y):
-                # If can, set it as assigned and update matrix.
-                square.set_coordinates(x, y)
-                assigned.append(square)
-                for i in range(x, x + square.size):
-                    for j in range(y, y + square.size):
-                        board.matrix[i][j] = "1"
-
-                # Store state of undo stack before forward checking.
-                stack_size_before = len(undo_stack)
-                coords_to_remove = domains[square]
-                del domains[square] # Remove the current square's domain since it's now assigned.
-
-                if forward_checking(square, x, y):
-                    result = run_csp()
-                    if result:
-                        return result
+        return True
+
+    def unassign(square: Square, cells: int, stack_size_before: int):
+        # Undoes placing the square on cells, restoring the domains using the undo stack.
+        nonlocal remaining_area
+        assigned.pop()
+        board.occupied &= ~cells
+        counts[square.size] += 1
+        remaining_area += square.size * square.size
+        while len(undo_stack) > stack_size_before:
+            size_changed, coords = undo_stack.pop()
+            domains[size_changed] = coords
 
+    def run_csp() -> List[Square] or False:
+        # CSP backtracking algorithm. Iterative, with each placed square, the coordinates
+        # left to try for it, its cells and the undo stack size before it on a stack, as
+        # solutions can place more squares than Python allows nested calls.
+        nonlocal remaining_area
+        frames = []
+        descend = True
+        while True:
+            if descend:
+                stats["nodes"] += 1
+                if len(assigned) == total:
+                    return assigned
+
+                # Selects the size of the next square to be assigned based on the Minimum Remaining Values heuristic.
+                size = min((size for size in domains if counts[size]), key=lambda x: popcount(domains[x]), default=None)
+                if size is None:
+                    descend = False
+                    continue
+                square = Square(size, index=dct["input_squares"][size] - counts[size])
+                locations = domains[size]
+                if size == pivot and square.index == 0:
+                    locations &= first_pivot_locations
+                coords = iter_bits(locations)
+            else:
                 # Backtrack if solution is not found.
-                assigned.pop()
-                for i in range(x, x + square.size):
-                    for j in range(y, y + square.size):
-                        board.matrix[i][j] = "0"
-
-                # Restore domains using the undo stack.
-                domains[square] = coords_to_remove
-                while len(undo_stack) > stack_size_before:
-                    s, coords = undo_stack.pop()
-                    if s in domains:
-                        domains[s].extend(coords)
-                    else:
-                        domains[s] = coords
-        return False
-    
-    assignments = run_csp()
+                if not frames:
+                    return False
+                square, coords, cells, stack_size_before = frames.pop()
+                unassign(square, cells, stack_size_before)
+                size = square.size
+
+            descend = False
+            for coord in coords:
+                x, y = divmod(coord, board.width)
+                # Check if can place square without violating constraint.
+                if is_consistent(square, x, y):
+                    # If can, set it as assigned and update the board.
+                    square.set_coordinates(x, y)
+                    assigned.append(square)
+                    cells = board.cover(square.size, x, y)
+                    board.occupied |= cells
+
+                    # Store state of undo stack before forward checking.
+                    stack_size_before = len(undo_stack)
+                    counts[size] -= 1 # One square fewer of this size to place.
+                    remaining_area -= size * size
+
+                    if forward_checking(square, x, y) and (len(assigned) == total or is_feasible(square, x, y)):
+                        frames.append((square, coords, cells, stack_size_before))
+                        descend = True
+                        break
+                    unassign(square, cells, stack_size_before)
+
+    # Returns [] if the squares cannot all be placed, as exact_cover.solve_exact_cover does.
+    if remaining_area > popcount(all_cells & ~board.occupied):
+        stats["area_cuts"] += 1
+        return []
+    assignments = run_csp() or []
     return [(square.size, square.x, square.y) for square in assignments]
@@ -0,0 +1,217 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Any
+from csp import Board, initialize_domains, iter_bits
+
+# Square packing as an exact cover problem, solved with Knuth's Algorithm X on
+# dancing links. Each option places one square: it covers the square's size and
+# the cells under it. Every size must be covered as many times as there are
+# squares of it, and every cell at most once, or exactly once when the squares'
+# area fills all the free cells. The search then branches on the first free cell
+# in row-major order, which only squares with their corner on it can cover, so
+# few squares are tried per step and the cells are filled in order.
+#
+# Square packing is NP-complete though, and a wrong choice early on can still only
+# show up many squares later. Most random tilings up to 30x30 (see the benchmark)
+# take tens of milliseconds, but about one in fifteen from 22x22 up takes minutes.
+
+class DancingLinks:
+    def __init__(self, needs: List[int], primary: List[bool], ordered: int = None):
+        # Items are numbered from 1, node 0 is the root of the list of primary items.
+        # needs holds how many options must cover each item (None for item 0). Primary
+        # items numbered from ordered on are branched on in order (see choose_item).
+        items = len(needs)
+        self.left = [i - 1 for i in range(items)]
+        self.right = [i + 1 for i in range(items)]
+        self.up = list(range(items))
+        self.down = list(range(items))
+        self.item = list(range(items))  # Item of each node, items being their own header nodes.
+        self.option = [None] * items  # Option of each node.
+        self.length = [0] * items  # Options left covering each item.
+        self.needs = list(needs)
+        self.ordered = len(needs) if ordered is None else ordered
+
+        # Link the primary items into the root's list, secondary items only link to themselves.
+        last = 0
+        for i in range(1, items):
+            if primary[i]:
+                self.left[i], self.right[last] = last, i
+                last = i
+            else:
+                self.left[i] = self.right[i] = i
+        self.left[0], self.right[last] = last, 0
+
+    def add_option(self, option: Any, items: List[int]) -> None:
+        # Appends an option covering the given items, as a circular row of nodes.
+        first = len(self.item)
+        for k, i in enumerate(items):
+            node = first + k
+            self.item.append(i)
+            self.option.append(option)
+            self.up.append(self.up[i])
+            self.down.append(i)
+            self.down[self.up[i]] = node
+            self.up[i] = node
+            self.length[i] += 1
+            self.left.append(node - 1 if k else first + len(items) - 1)
+            self.right.append(node + 1 if k < len(items) - 1 else first)
+
+    def cover(self, i: int) -> None:
+        # Removes item i from the list and every option covering it from the other items.
+        left, right, down = self.left, self.right, self.down
+        right[left[i]], left[right[i]] = right[i], left[i]
+        row = down[i]
+        while row != i:
+            self.hide(row)
+            row = down[row]
+
+    def uncover(self, i: int) -> None:
+        left, right, up = self.left, self.right, self.up
+        row = up[i]
+        while row != i:
+            self.unhide(row)
+            row = up[row]
+        right[left[i]] = left[right[i]] = i
+
+    def hide(self, node: int) -> None:
+        # Unlinks the option of node from all its items but node's own.
+        up, down, right, item, length = self.up, self.down, self.right, self.item, self.length
+        other = right[node]
+        while other != node:
+            down[up[other]], up[down[other]] = down[other], up[other]
+            length[item[other]] -= 1
+            other = right[other]
+
+    def unhide(self, node: int) -> None:
+        up, down, left, item, length = self.up, self.down, self.left, self.item, self.length
+        other = left[node]
+        while other != node:
+            down[up[other]] = up[down[other]] = other
+            length[item[other]] += 1
+            other = left[other]
+
+    def choose_item(self) -> int:
+        # Item to branch on, 0 if none are left. An item needed n more times by k options
+        # allows k - n + 1 choices for its next one. Items with at most one choice go
+        # first, then the first ordered item left, else the item with the fewest
+        # choices (Knuth's MRV).
+        best, best_choices, first = 0, None, 0
+        i = self.right[0]
+        while i:
+            choices = self.length[i] - self.needs[i] + 1
+            if choices <= 1:
+                return i
+            if not first and i >= self.ordered:
+                first = i
+            if best_choices is None or choices < best_choices:
+                best, best_choices = i, choices
+            i = self.right[i]
+        return first or best
+
+    def search(self, chosen: List[Any]) -> bool:
+        # Algorithm X, extending chosen with options until every primary item is
+        # covered as many times as needed. Returns False if that cannot be done.
+        # Iterative, with the item, option row and rows tried for it of each option
+        # chosen on a stack, as solutions can take more options than Python allows
+        # nested calls.
+        stack = []
+        descend = True
+        while True:
+            if descend:
+                i = self.choose_item()
+                if not i:
+                    return True
+                # Too few options left for the item leaves none to try.
+                row = self.down[i] if self.length[i] >= self.needs[i] else i
+                tried = []
+            else:
+                # Undo the last option chosen and move on to the next one for its item.
+                if not stack:
+                    return False
+                i, row, tried = stack.pop()
+                chosen.pop()
+                self._deselect(row)
+                if not self.needs[i]:
+                    self.uncover(i)
+                self.needs[i] += 1
+                row = self.down[row]
+
+            if row == i:
+                # Every option for the item tried, backtrack.
+                for row in reversed(tried):
+                    self.unhide(row)
+                    self._relink(row)
+                descend = False
+                continue
+
+            # While an item is needed more than once, each option tried for it is kept
+            # out of the sibling branches, so each set of options is only found once.
+            self.needs[i] -= 1
+            if self.needs[i]:
+                self._unlink(row)
+                self.hide(row)
+                tried.append(row)
+            else:
+                self.cover(i)
+            self._select(row)
+            chosen.append(self.option[row])
+            stack.append((i, row, tried))
+            descend = True
+
+    def _unlink(self, node: int) -> None:
+        # Unlinks node alone from its item.
+        self.down[self.up[node]], self.up[self.down[node]] = self.down[node], self.up[node]
+        self.length[self.item[node]] -= 1
+
+    def _relink(self, node: int) -> None:
+        self.down[self.up[node]] = self.up[self.down[node]] = node
+        self.length[self.item[node]] += 1
+
+    def _select(self, row: int) -> None:
+        # Counts the option of row towards its other items, covering those not needed
+        # any more. The option itself has already been unlinked from them.
+        node = self.right[row]
+        while node != row:
+            i = self.item[node]
+            self.needs[i] -= 1
+            if not self.needs[i]:
+                self.cover(i)
+            node = self.right[node]
+
+    def _deselect(self, row: int) -> None:
+        node = self.left[row]
+        while node != row:
+            i = self.item[node]
+            if not self.needs[i]:
+                self.uncover(i)
+            self.needs[i] += 1
+            node = self.left[node]
+
+def solve_exact_cover(dct: Dict[str, Any]) -> List[Tuple[int, int, int]]:
+    # Places the squares with Algorithm X, returning (size, x, y) for each square
+    # like solve_CSP, or [] if they cannot all be placed.
+    board = Board(dct["rows"], dct["cols"], dct["obstacles"])
+    domains = initialize_domains(board, dct["input_squares"])
+    sizes = sorted(domains, reverse=True)
+    counts = [dct["input_squares"][size] for size in sizes]
+
+    free_cells = board.height * board.width - bin(board.blocked).count("1")
+    area = sum(size * size * count for size, count in zip(sizes, counts))
+    if area > free_cells:
+        return []
+    exact = area == free_cells
+
+    # Items: one per size, then one per cell in row-major order, the cells being primary
+    # and branched on in order when they must all be covered.
+    size_items = {size: k + 1 for k, size in enumerate(sizes)}
+    first_cell = len(sizes) + 1
+    needs = [None] + counts + [1] * (board.height * board.width)
+    primary = [False] + [True] * len(sizes) + [exact and not board.blocked >> cell & 1 for cell in range(board.height * board.width)]
+    links = DancingLinks(needs, primary, first_cell)
+    for size in sizes:
+        for coord in iter_bits(domains[size]):
+            x, y = divmod(coord, board.width)
+            cells = [first_cell + cell for cell in iter_bits(board.cover(size, x, y))]
+            links.add_option((size, x, y), [size_items[size]] + cells)
+
+    chosen = []
+    return chosen if links.search(chosen) else []